@@ -192,15 +192,19 @@ elif pags == "Blockchain":
             st.write(f"**Tiempo minado:** {bloque.tiempo_minado}")
 
             st.write("**Transacciones:**")
-            for tx in bloque.transacciones:
-                st.json(tx)
+            transacciones = sistema.get_transacciones_bloque(bloque.idx)
+            if transacciones is None:
+                st.warning("Las transacciones de este bloque fueron podadas.")
+            else:
+                for tx in transacciones:
+                    st.json(tx)
 
     def visualizar_blockchain(blockchain):
         dot = Digraph(comment='Blockchain')
         dot.attr(rankdir='LR')
 
         for bloque in blockchain:
-            label = f'Bloque {bloque.idx}\nNonce: {bloque.nonce}\nHash: {bloque.hash} \nTxs: {len(bloque.transacciones)}'
+            label = f'Bloque {bloque.idx}\nNonce: {bloque.nonce}\nHash: {bloque.hash} \nTxs: {bloque.num_transacciones}'
             dot.node(str(bloque.idx), label=label, shape='box', style='filled', color='lightblue')
 
         for i in range(1, len(blockchain)):
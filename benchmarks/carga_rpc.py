@@ -0,0 +1,142 @@
+"""
+Cliente de carga para el servidor RPC local (src/ServidorRPC.py).
+
+Crea usuarios, les reparte saldo y después envía transacciones y consultas de saldo desde
+varias conexiones concurrentes, minando cada cierto número de transacciones.
+Reporta el throughput y la latencia p50/p99 por tipo de petición.
+
+Uso (desde la raíz del repositorio):
+    python -m src.ServidorRPC --dificultad 1 --silencioso
+    python -m benchmarks.carga_rpc --peticiones 2000 --conexiones 8
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.estadisticas import percentil
+
+
+class ClienteRPC:
+    """Conexión HTTP/1.1 keep-alive con el servidor RPC."""
+
+    def __init__(self, host, puerto):
+
+        self.host = host
+        self.puerto = puerto
+        self.reader = None
+        self.writer = None
+
+    async def conectar(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.puerto)
+
+    async def cerrar(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def peticion(self, metodo, ruta, datos=None):
+        """Envía una petición y devuelve la respuesta JSON decodificada."""
+        cuerpo = json.dumps(datos).encode() if datos is not None else b""
+        self.writer.write(
+            f"{metodo} {ruta} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n\r\n".encode() + cuerpo
+        )
+        await self.writer.drain()
+
+        estado = await self.reader.readline()
+        longitud = 0
+        while True:
+            linea = await self.reader.readline()
+            if linea in (b"\r\n", b""):
+                break
+            nombre, valor = linea.decode().split(":", 1)
+            if nombre.strip().lower() == "content-length":
+                longitud = int(valor)
+        respuesta = json.loads(await self.reader.readexactly(longitud))
+
+        if not estado.startswith(b"HTTP/1.1 200"):
+            raise RuntimeError(f"{metodo} {ruta}: {estado.decode().strip()} {respuesta}")
+        return respuesta
+
+
+async def preparar(cliente, args):
+    """Crea los usuarios de la prueba y les reparte saldo desde el usuario génesis."""
+    usuarios = [(await cliente.peticion("POST", "/usuarios"))["idx"] for _ in range(args.usuarios)]
+
+    # Varios UTXOs por usuario, para que puedan enviar más de una transacción por bloque.
+    # El génesis solo tiene un UTXO disponible por bloque (el cambio llega al minar).
+    for _ in range(args.utxos_por_usuario):
+        for idx in usuarios:
+            await cliente.peticion("POST", "/tx", {"emisor": 0, "receptor": idx, "cantidad": args.saldo_inicial})
+            await cliente.peticion("POST", "/minar", {"minero": 0})
+    return usuarios
+
+
+async def trabajador(cliente, usuarios, args, contador, latencias, rng):
+    """Envía peticiones hasta agotar el contador compartido."""
+    while contador[0] < args.peticiones:
+        contador[0] += 1
+        n = contador[0]
+
+        if n % args.tx_por_bloque == 0:
+            tipo, metodo, ruta, datos = "minar", "POST", "/minar", {"minero": rng.choice(usuarios)}
+        elif rng.random() < args.proporcion_consultas:
+            tipo, metodo, ruta, datos = "saldo", "GET", f"/saldo/{rng.choice(usuarios)}", None
+        else:
+            emisor, receptor = rng.sample(usuarios, 2)
+            datos = {"emisor": emisor, "receptor": receptor, "cantidad": round(rng.uniform(0.1, 1), 2)}
+            tipo, metodo, ruta = "tx", "POST", "/tx"
+
+        inicio = time.perf_counter()
+        await cliente.peticion(metodo, ruta, datos)
+        latencias.setdefault(tipo, []).append(time.perf_counter() - inicio)
+
+
+async def ejecutar(args):
+    rng = random.Random(args.semilla)
+    clientes = [ClienteRPC(args.host, args.puerto) for _ in range(args.conexiones)]
+    for cliente in clientes:
+        await cliente.conectar()
+
+    usuarios = await preparar(clientes[0], args)
+
+    contador = [0]
+    latencias = {}
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador(c, usuarios, args, contador, latencias, rng) for c in clientes))
+    duracion = time.perf_counter() - inicio
+
+    estado = await clientes[0].peticion("GET", "/estado")
+    for cliente in clientes:
+        await cliente.cerrar()
+
+    total = sum(len(v) for v in latencias.values())
+    print(f"{total} peticiones en {duracion:.2f} s con {args.conexiones} conexiones: {total / duracion:.1f} peticiones/s")
+    print(f"{'tipo':<8}{'n':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for tipo, valores in sorted(latencias.items()):
+        print(f"{tipo:<8}{len(valores):>8}{percentil(valores, 50) * 1e3:>10.2f}{percentil(valores, 99) * 1e3:>10.2f}")
+    print(f"Estado final: {estado}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del servidor RPC.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8545)
+    parser.add_argument("--peticiones", type=int, default=2000)
+    parser.add_argument("--conexiones", type=int, default=8)
+    parser.add_argument("--usuarios", type=int, default=20)
+    parser.add_argument("--utxos-por-usuario", type=int, default=3)
+    parser.add_argument("--saldo-inicial", type=float, default=10)
+    parser.add_argument("--tx-por-bloque", type=int, default=100)
+    parser.add_argument("--proporcion-consultas", type=float, default=0.2)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(ejecutar(args))
+
+
+if __name__ == "__main__":
+    main()
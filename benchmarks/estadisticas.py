@@ -0,0 +1,10 @@
+"""Funciones estadísticas compartidas por los benchmarks."""
+
+
+def percentil(valores, p):
+    """Devuelve el percentil p (0-100) de una lista de valores."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    i = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[i]
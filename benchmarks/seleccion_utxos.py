@@ -0,0 +1,101 @@
+"""
+Benchmark de las estrategias de selección de UTXOs.
+
+Ejecuta la misma carga de trabajo (pagos aleatorios entre usuarios y minado periódico)
+con cada estrategia y reporta el tamaño del conjunto de UTXOs y la latencia de selección.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.seleccion_utxos --transacciones 2000 --usuarios 20
+"""
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from src.Sistema import Sistema
+from src.SeleccionUTXO import ESTRATEGIAS
+from benchmarks.estadisticas import percentil
+
+
+class EstrategiaMedida:
+    """Envuelve una estrategia de selección y registra la duración de cada llamada."""
+
+    def __init__(self, estrategia):
+
+        self.estrategia = estrategia
+        self.latencias = []
+
+    def seleccionar(self, utxos, objetivo):
+        inicio = time.perf_counter()
+        seleccionados = self.estrategia.seleccionar(utxos, objetivo)
+        self.latencias.append(time.perf_counter() - inicio)
+        return seleccionados
+
+
+def ejecutar_carga(nombre, estrategia, args, umbral_consolidacion=None):
+    """Ejecuta la carga de trabajo con una estrategia y devuelve sus métricas."""
+    rng = random.Random(args.semilla)
+    medida = EstrategiaMedida(estrategia)
+    tamanos_utxos = []
+    aceptadas = 0
+
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        sistema = Sistema(dificultad=args.dificultad, estrategia_seleccion=medida,
+                          umbral_consolidacion=umbral_consolidacion)
+        usuarios = [sistema.crear_usuario() for _ in range(args.usuarios)]
+
+        for usuario in usuarios:
+            sistema.procesar_tx(sistema.primer_usuario, usuario, args.saldo_inicial)
+        sistema.minar_bloque(sistema.primer_usuario)
+
+        for i in range(args.transacciones):
+            emisor, receptor = rng.sample(usuarios, 2)
+            cantidad = round(rng.uniform(0.5, args.saldo_inicial / 4), 2)
+            if sistema.procesar_tx(emisor, receptor, cantidad):
+                aceptadas += 1
+
+            if (i + 1) % args.tx_por_bloque == 0:
+                sistema.minar_bloque(rng.choice(usuarios))
+                tamanos_utxos.append(len(sistema.UTXOs_set))
+
+        sistema.minar_bloque(rng.choice(usuarios))
+        tamanos_utxos.append(len(sistema.UTXOs_set))
+    duracion = time.perf_counter() - inicio
+
+    return {
+        "estrategia": nombre,
+        "aceptadas": aceptadas,
+        "utxos_final": tamanos_utxos[-1],
+        "utxos_max": max(tamanos_utxos),
+        "p50_us": percentil(medida.latencias, 50) * 1e6,
+        "p99_us": percentil(medida.latencias, 99) * 1e6,
+        "duracion_s": duracion,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de estrategias de selección de UTXOs.")
+    parser.add_argument("--transacciones", type=int, default=2000)
+    parser.add_argument("--usuarios", type=int, default=20)
+    parser.add_argument("--saldo-inicial", type=float, default=40)
+    parser.add_argument("--tx-por-bloque", type=int, default=10)
+    parser.add_argument("--dificultad", type=int, default=1)
+    parser.add_argument("--umbral-consolidacion", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args()
+
+    corridas = [(nombre, clase(), None) for nombre, clase in ESTRATEGIAS.items()]
+    corridas.append((f"menor_primero+consolidacion({args.umbral_consolidacion})",
+                     ESTRATEGIAS["menor_primero"](), args.umbral_consolidacion))
+
+    print(f"{'estrategia':<36}{'aceptadas':>10}{'utxos':>8}{'max':>8}{'p50 us':>10}{'p99 us':>10}{'total s':>10}")
+    for nombre, estrategia, umbral in corridas:
+        r = ejecutar_carga(nombre, estrategia, args, umbral)
+        print(f"{r['estrategia']:<36}{r['aceptadas']:>10}{r['utxos_final']:>8}{r['utxos_max']:>8}"
+              f"{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}{r['duracion_s']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Ejecución de simulaciones sin interfaz gráfica.
+
+A diferencia de Network_simulation.py no importa streamlit, pandas ni graphviz, y el
+sistema se importa solo cuando un comando lo necesita, para que los trabajos cortos
+no paguen el tiempo de arranque.
+
+Uso:
+    python simulacion_cli.py crear sistema.pkl --dificultad 2 --usuarios 10 --saldo-inicial 50
+    python simulacion_cli.py carga sistema.pkl --transacciones 500 --tx-por-bloque 20
+    python simulacion_cli.py minar sistema.pkl --bloques 5 --minero 1
+    python simulacion_cli.py validar sistema.pkl
+    python simulacion_cli.py --tiempos info sistema.pkl
+"""
+import time
+
+INICIO = time.perf_counter()
+
+import argparse
+import contextlib
+import io
+import sys
+
+
+class ErrorArgumentos(Exception):
+    """Argumento que solo se puede validar después de cargar el sistema."""
+
+
+def importar_sistema(tiempos):
+    """Importa la clase Sistema y registra cuánto tardó la importación."""
+    inicio = time.perf_counter()
+    from src.Sistema import Sistema
+    tiempos["importar src.Sistema"] = time.perf_counter() - inicio
+    return Sistema
+
+
+def cargar(ruta, tiempos):
+    """Carga un sistema guardado con pickle."""
+    import pickle
+
+    importar_sistema(tiempos)
+    inicio = time.perf_counter()
+    with open(ruta, "rb") as f:
+        sistema = pickle.load(f)
+    tiempos["cargar estado"] = time.perf_counter() - inicio
+    return sistema
+
+
+def guardar(sistema, ruta, tiempos):
+    """Guarda un sistema con pickle, en el mismo formato que la aplicación de Streamlit."""
+    import pickle
+
+    inicio = time.perf_counter()
+    with open(ruta, "wb") as f:
+        pickle.dump(sistema, f)
+    tiempos["guardar estado"] = time.perf_counter() - inicio
+
+
+def comando_crear(args, tiempos):
+    Sistema = importar_sistema(tiempos)
+
+    inicio = time.perf_counter()
+    sistema = Sistema(dificultad=args.dificultad, profundidad_poda=args.profundidad_poda,
+                      directorio_poda=args.directorio_poda)
+    for _ in range(args.usuarios):
+        usuario = sistema.crear_usuario()
+        if args.saldo_inicial > 0:
+            # El génesis tiene un solo UTXO disponible por bloque, así que se mina después de cada envío
+            sistema.procesar_tx(sistema.primer_usuario, usuario, args.saldo_inicial)
+            sistema.minar_bloque(sistema.primer_usuario)
+    tiempos["crear sistema"] = time.perf_counter() - inicio
+
+    guardar(sistema, args.estado, tiempos)
+    return f"Sistema creado con {len(sistema.usuarios)} usuarios en {args.estado}."
+
+
+def comando_carga(args, tiempos):
+    import random
+
+    sistema = cargar(args.estado, tiempos)
+    if len(sistema.usuarios) < 2:
+        return "Se necesitan al menos dos usuarios para generar transacciones."
+
+    rng = random.Random(args.semilla)
+    aceptadas = 0
+    inicio = time.perf_counter()
+    for i in range(args.transacciones):
+        emisor, receptor = rng.sample(sistema.usuarios, 2)
+        cantidad = round(rng.uniform(args.cantidad_min, args.cantidad_max), 2)
+        if sistema.procesar_tx(emisor, receptor, cantidad):
+            aceptadas += 1
+        if (i + 1) % args.tx_por_bloque == 0:
+            sistema.minar_bloque(rng.choice(sistema.usuarios))
+    if sistema.mempool:
+        sistema.minar_bloque(rng.choice(sistema.usuarios))
+    tiempos["carga de trabajo"] = time.perf_counter() - inicio
+
+    guardar(sistema, args.estado, tiempos)
+    return f"{aceptadas} de {args.transacciones} transacciones aceptadas, {len(sistema.blockchain)} bloques."
+
+
+def comando_minar(args, tiempos):
+    sistema = cargar(args.estado, tiempos)
+    if args.minero >= len(sistema.usuarios):
+        raise ErrorArgumentos(f"--minero debe ser menor que el número de usuarios ({len(sistema.usuarios)}).")
+    minero = sistema.usuarios[args.minero]
+
+    inicio = time.perf_counter()
+    for _ in range(args.bloques):
+        sistema.minar_bloque(minero)
+    tiempos["minar"] = time.perf_counter() - inicio
+
+    guardar(sistema, args.estado, tiempos)
+    return f"{args.bloques} bloques minados, altura {len(sistema.blockchain) - 1}."
+
+
+def comando_validar(args, tiempos):
+    sistema = cargar(args.estado, tiempos)
+
+    inicio = time.perf_counter()
+    valida = sistema.validar_cadena()
+    tiempos["validar"] = time.perf_counter() - inicio
+    return "Cadena válida." if valida else "Cadena inválida."
+
+
+def comando_info(args, tiempos):
+    sistema = cargar(args.estado, tiempos)
+    return (
+        f"Usuarios: {len(sistema.usuarios)}\n"
+        f"Bloques: {len(sistema.blockchain)}\n"
+        f"Transacciones pendientes: {len(sistema.mempool)}\n"
+        f"UTXOs: {len(sistema.UTXOs_set)}\n"
+        f"Recompensas acumuladas: {sum(sistema.recompensas)}\n"
+        f"Dificultad de minería: {sistema.dificultad}"
+    )
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Simulador de blockchain sin interfaz gráfica.")
+    parser.add_argument("--tiempos", action="store_true", help="Reportar tiempos de importación, arranque y trabajo.")
+    parser.add_argument("--verbose", action="store_true", help="Mostrar los mensajes que imprime el sistema.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    crear = subparsers.add_parser("crear", help="Crear un sistema nuevo y guardarlo.")
+    crear.add_argument("estado", help="Archivo .pkl donde se guarda el sistema.")
+    crear.add_argument("--dificultad", type=int, default=4)
+    crear.add_argument("--usuarios", type=int, default=0, help="Usuarios adicionales al génesis.")
+    crear.add_argument("--saldo-inicial", type=float, default=0, help="Monedas que el génesis envía a cada usuario.")
+    crear.add_argument("--profundidad-poda", type=int, default=None)
+    crear.add_argument("--directorio-poda", default=None)
+    crear.set_defaults(funcion=comando_crear)
+
+    carga = subparsers.add_parser("carga", help="Ejecutar transacciones aleatorias y minar periódicamente.")
+    carga.add_argument("estado")
+    carga.add_argument("--transacciones", type=int, default=100)
+    carga.add_argument("--tx-por-bloque", type=int, default=10)
+    carga.add_argument("--cantidad-min", type=float, default=0.5)
+    carga.add_argument("--cantidad-max", type=float, default=5)
+    carga.add_argument("--semilla", type=int, default=None)
+    carga.set_defaults(funcion=comando_carga)
+
+    minar = subparsers.add_parser("minar", help="Minar N bloques.")
+    minar.add_argument("estado")
+    minar.add_argument("--bloques", type=int, default=1)
+    minar.add_argument("--minero", type=int, default=0, help="Índice del usuario minero.")
+    minar.set_defaults(funcion=comando_minar)
+
+    validar = subparsers.add_parser("validar", help="Validar la cadena de bloques de un sistema guardado.")
+    validar.add_argument("estado")
+    validar.set_defaults(funcion=comando_validar)
+
+    info = subparsers.add_parser("info", help="Mostrar un resumen de un sistema guardado.")
+    info.add_argument("estado")
+    info.set_defaults(funcion=comando_info)
+
+    return parser
+
+
+def validar_argumentos(parser, args):
+    """Termina con un mensaje de uso si algún argumento numérico está fuera de rango."""
+    minimos = {
+        "dificultad": 0, "usuarios": 0, "saldo_inicial": 0, "profundidad_poda": 1,
+        "transacciones": 0, "tx_por_bloque": 1, "bloques": 0, "minero": 0,
+    }
+    for nombre, minimo in minimos.items():
+        valor = getattr(args, nombre, None)
+        if valor is not None and valor < minimo:
+            parser.error(f"--{nombre.replace('_', '-')} debe ser al menos {minimo}.")
+
+    if getattr(args, "cantidad_min", None) is not None:
+        if args.cantidad_min <= 0 or args.cantidad_min > args.cantidad_max:
+            parser.error("--cantidad-min debe ser positiva y no mayor que --cantidad-max.")
+
+
+def main():
+    parser = crear_parser()
+    args = parser.parse_args()
+    validar_argumentos(parser, args)
+    tiempos = {"arranque": time.perf_counter() - INICIO}
+
+    salida = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    try:
+        with salida:
+            resultado = args.funcion(args, tiempos)
+    except ErrorArgumentos as e:
+        parser.error(str(e))
+    print(resultado)
+
+    if args.tiempos:
+        tiempos["total"] = time.perf_counter() - INICIO
+        for etapa, duracion in tiempos.items():
+            print(f"{etapa:<24}{duracion * 1e3:>10.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,34 @@
 from hashlib import sha256
 from datetime import datetime
 import json
+import os
+
+COMPROMISO_VACIO = sha256(b"").hexdigest()
+
+def hash_tx(tx_dict):
+    """Calcula el hash de una transacción a partir de su diccionario."""
+    return sha256(json.dumps(tx_dict, sort_keys=True).encode()).hexdigest()
+
+def extender_compromiso(compromiso, tx_dict):
+    """Agrega una transacción al compromiso acumulado de una lista de transacciones."""
+    return sha256((compromiso + hash_tx(tx_dict)).encode()).hexdigest()
+
+def cerrar_compromiso(coinbase_dict, compromiso):
+    """Combina la transacción coinbase con el compromiso acumulado del resto de las transacciones."""
+    return sha256((hash_tx(coinbase_dict) + compromiso).encode()).hexdigest()
+
+def calcular_compromiso(transacciones):
+    """
+    Calcula el compromiso de las transacciones de un bloque (la primera es la coinbase).
+    Se construye de forma incremental para que el sistema pueda mantenerlo mientras llegan transacciones.
+    """
+    if not transacciones:
+        return COMPROMISO_VACIO
+
+    compromiso = COMPROMISO_VACIO
+    for tx_dict in transacciones[1:]:
+        compromiso = extender_compromiso(compromiso, tx_dict)
+    return cerrar_compromiso(transacciones[0], compromiso)
 
 class Bloque:
     """
@@ -9,22 +37,50 @@ class Bloque:
         idx: Índice del bloque, utilizado para identificarlo de manera única.
         transacciones: Lista de transacciones incluidas en el bloque.
         previous_hash: Hash del bloque anterior, utilizado para enlazar los bloques.
+        compromiso: Compromiso (hash acumulado) de las transacciones, es lo que se incluye en el hash del bloque.
+        num_transacciones: Número de transacciones del bloque, se conserva aunque el bloque se pode.
+        podado: Indica si el cuerpo (transacciones) del bloque fue descartado de memoria.
+        ruta_transacciones: Archivo donde se guardaron las transacciones al podar, None si se descartaron.
+        hash_legado: Indica que el bloque se cargó de un archivo anterior al compromiso de transacciones,
+            y que su hash se calcula con el formato original (todas las transacciones en el hash).
         
     Métodos:
         crear_dict: Crea un diccionario con los atributos del bloque.
+        crear_encabezado: Crea un diccionario con los atributos que forman parte del hash.
         calcular_hash: Calcula el hash del bloque utilizando sus atributos.
+        __setstate__: Completa los atributos que faltan al cargar bloques guardados con versiones anteriores.
+        podar: Descarta las transacciones del bloque, opcionalmente guardándolas en disco.
+        cargar_transacciones: Devuelve las transacciones del bloque, leyéndolas de disco si fue podado.
     """
-    def __init__(self, idx, transacciones, previous_hash):
+    def __init__(self, idx, transacciones, previous_hash, compromiso=None):
 
         self.idx = idx
         self.timestamp = str(datetime.now())
         self.transacciones = transacciones
         self.previous_hash = previous_hash
+        self.compromiso = compromiso if compromiso is not None else calcular_compromiso(transacciones)
         self.nonce = 0
         self.tiempo_minado = None
         self.recompensa = None
+        self.num_transacciones = len(transacciones)
+        self.podado = False
+        self.ruta_transacciones = None
+        self.hash_legado = False
         self.hash = self.calcular_hash()
 
+    def __setstate__(self, estado):
+        """
+        Completa los atributos que faltan al cargar bloques guardados (pickle) con versiones anteriores.
+        """
+        self.__dict__.update(estado)
+        if "compromiso" not in estado:
+            self.hash_legado = True
+            self.compromiso = calcular_compromiso(self.transacciones)
+        self.__dict__.setdefault("hash_legado", False)
+        self.__dict__.setdefault("num_transacciones", len(self.transacciones or []))
+        self.__dict__.setdefault("podado", False)
+        self.__dict__.setdefault("ruta_transacciones", None)
+
 
     def crear_dict(self):
         """
@@ -35,6 +91,7 @@ class Bloque:
             "timestamp": self.timestamp,
             "transacciones": self.transacciones,
             "previous_hash": self.previous_hash,
+            "compromiso": self.compromiso,
             "nonce": self.nonce,
             "tiempo_minado": self.tiempo_minado,
             "recompensa": self.recompensa,
@@ -42,11 +99,71 @@ class Bloque:
         }
         return bloque_dict
 
+    def crear_encabezado(self):
+        """
+        Crea un diccionario con los atributos que forman parte del hash.
+        Las transacciones entran solo a través de su compromiso, así que el costo de cada intento
+        de minado no depende del número de transacciones, y el tiempo de minado se excluye porque
+        se conoce hasta terminar de minar.
+        """
+        encabezado = {
+            "idx": self.idx,
+            "timestamp": self.timestamp,
+            "compromiso": self.compromiso,
+            "previous_hash": self.previous_hash,
+            "nonce": self.nonce,
+            "recompensa": self.recompensa,
+        }
+        return encabezado
+
     def calcular_hash(self):
         """
-        Calcula el hash del bloque utilizando sus atributos.
+        Calcula el hash del bloque utilizando su encabezado.
+        Los bloques legados se calculan con el formato original, que se minaba antes de
+        conocer el tiempo de minado y la recompensa.
         """
-        bloque_data = self.crear_dict()
+        if self.hash_legado:
+            bloque_data = self.crear_dict()
+            del bloque_data["compromiso"]
+            bloque_data["tiempo_minado"] = None
+            bloque_data["recompensa"] = None
+        else:
+            bloque_data = self.crear_encabezado()
         bloque_data_str = json.dumps(bloque_data, sort_keys=True)
 
-        return sha256(bloque_data_str.encode()).hexdigest()
\ No newline at end of file
+        return sha256(bloque_data_str.encode()).hexdigest()
+
+    def podar(self, directorio=None):
+        """
+        Descarta las transacciones del bloque para liberar memoria.
+        Si se indica un directorio, las transacciones se guardan en disco antes de descartarlas.
+        El hash y el encabezado (incluido el compromiso de las transacciones) se conservan.
+        """
+        if self.podado:
+            return
+
+        if directorio is not None:
+            os.makedirs(directorio, exist_ok=True)
+            ruta = os.path.join(directorio, f"bloque_{self.idx}_{self.hash}.json")
+            with open(ruta, "w") as f:
+                json.dump(self.transacciones, f)
+            self.ruta_transacciones = ruta
+
+        self.transacciones = None
+        self.podado = True
+
+    def cargar_transacciones(self):
+        """
+        Devuelve las transacciones del bloque.
+        Si el bloque fue podado se leen de disco sin volver a guardarlas en memoria,
+        y si se descartaron sin respaldo se devuelve None.
+        """
+        if not self.podado:
+            return self.transacciones
+
+        if self.ruta_transacciones is None:
+            print(f"Error: las transacciones del bloque {self.idx} fueron podadas y no están disponibles.")
+            return None
+
+        with open(self.ruta_transacciones) as f:
+            return json.load(f)
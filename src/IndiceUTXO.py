@@ -0,0 +1,69 @@
+from bisect import bisect_left, insort
+
+class IndiceUTXO:
+    """
+    Clase que mantiene los UTXOs disponibles de cada propietario ordenados por cantidad.
+    Evita recorrer y ordenar todo el conjunto de UTXOs cada vez que un usuario envía una transacción.
+    Parámetros:
+        utxos_por_propietario: Diccionario que relaciona cada dirección con su lista ordenada de UTXOs.
+    Métodos:
+        agregar: Inserta un UTXO en la lista ordenada de su propietario.
+        posicion: Devuelve la posición de un UTXO en la lista de su propietario.
+        eliminar: Elimina un UTXO de la lista de su propietario, si está presente.
+        get: Devuelve la lista ordenada de UTXOs disponibles de una dirección.
+        buscar: Busca un UTXO de una dirección a partir de su txid y cantidad.
+        contar: Devuelve el número de UTXOs disponibles de una dirección.
+    """
+    def __init__(self):
+
+        self.utxos_por_propietario = {}
+
+    def agregar(self, utxo):
+        """Inserta un UTXO en la lista ordenada de su propietario."""
+        lista = self.utxos_por_propietario.setdefault(utxo.propietario, [])
+        insort(lista, utxo, key=lambda x: x.cantidad)
+
+    def posicion(self, utxo):
+        """Devuelve la posición del UTXO en la lista de su propietario, o None si no está."""
+        lista = self.utxos_por_propietario.get(utxo.propietario, [])
+        i = bisect_left(lista, utxo.cantidad, key=lambda x: x.cantidad)
+
+        while i < len(lista) and lista[i].cantidad == utxo.cantidad:
+            if lista[i] is utxo:
+                return i
+            i += 1
+        return None
+
+    def eliminar(self, utxo):
+        """Elimina un UTXO de la lista de su propietario. Devuelve False si no estaba."""
+        i = self.posicion(utxo)
+        if i is None:
+            return False
+
+        lista = self.utxos_por_propietario[utxo.propietario]
+        del lista[i]
+        if not lista:
+            del self.utxos_por_propietario[utxo.propietario]
+        return True
+
+    def get(self, direccion):
+        """Devuelve la lista ordenada (de menor a mayor cantidad) de UTXOs disponibles de una dirección."""
+        return self.utxos_por_propietario.get(direccion, [])
+
+    def buscar(self, direccion, txid, cantidad, excluidos=()):
+        """
+        Busca un UTXO de una dirección a partir de su txid y cantidad.
+        Se omiten los UTXOs cuyo id está en excluidos (por ejemplo, los ya gastados en el mismo bloque).
+        """
+        lista = self.get(direccion)
+        i = bisect_left(lista, cantidad, key=lambda x: x.cantidad)
+
+        while i < len(lista) and lista[i].cantidad == cantidad:
+            if lista[i].txid == txid and id(lista[i]) not in excluidos:
+                return lista[i]
+            i += 1
+        return None
+
+    def contar(self, direccion):
+        """Devuelve el número de UTXOs disponibles de una dirección."""
+        return len(self.get(direccion))
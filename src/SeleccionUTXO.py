@@ -0,0 +1,158 @@
+import random
+
+class EstrategiaSeleccion:
+    """
+    Clase base para las estrategias de selección de UTXOs (coin selection).
+    Las estrategias reciben los UTXOs disponibles del emisor ordenados de menor a mayor cantidad
+    y la cantidad objetivo (cantidad + mining_fee), y no deben modificar la lista recibida.
+    Métodos:
+        seleccionar: Devuelve la lista de UTXOs seleccionados o None si no alcanzan para cubrir el objetivo.
+    """
+    def seleccionar(self, utxos, objetivo):
+        """Devuelve la lista de UTXOs seleccionados o None si no alcanzan para cubrir el objetivo."""
+        raise NotImplementedError
+
+
+class MenorPrimero(EstrategiaSeleccion):
+    """Selecciona los UTXOs de menor a mayor cantidad hasta cubrir el objetivo.
+    Es la estrategia original del sistema y tiende a consumir los UTXOs pequeños."""
+
+    def seleccionar(self, utxos, objetivo):
+        """Acumula UTXOs de menor a mayor cantidad hasta cubrir el objetivo."""
+        seleccionados = []
+        total = 0
+
+        for utxo in utxos:
+            seleccionados.append(utxo)
+            total += utxo.cantidad
+            if total >= objetivo:
+                return seleccionados
+        return None
+
+
+class MayorPrimero(EstrategiaSeleccion):
+    """Selecciona los UTXOs de mayor a menor cantidad hasta cubrir el objetivo.
+    Usa pocas entradas por transacción, pero deja que los UTXOs pequeños se acumulen."""
+
+    def seleccionar(self, utxos, objetivo):
+        """Acumula UTXOs de mayor a menor cantidad hasta cubrir el objetivo."""
+        seleccionados = []
+        total = 0
+
+        for utxo in reversed(utxos):
+            seleccionados.append(utxo)
+            total += utxo.cantidad
+            if total >= objetivo:
+                return seleccionados
+        return None
+
+
+class BranchAndBound(EstrategiaSeleccion):
+    """
+    Busca un subconjunto de UTXOs cuya suma quede entre el objetivo y el objetivo más la tolerancia.
+    Con la tolerancia por defecto solo acepta coincidencias exactas (salvo redondeo), que no generan cambio;
+    con una tolerancia mayor el exceso regresa al emisor como un cambio pequeño.
+    Si no encuentra una combinación dentro del límite de intentos, usa la estrategia de respaldo.
+    Parámetros:
+        tolerancia: Exceso máximo permitido sobre el objetivo.
+        max_intentos: Número máximo de pasos de la búsqueda.
+        respaldo: Estrategia a usar cuando no hay coincidencia exacta.
+    """
+    def __init__(self, tolerancia=1e-9, max_intentos=100000, respaldo=None):
+
+        self.tolerancia = tolerancia
+        self.max_intentos = max_intentos
+        self.respaldo = respaldo if respaldo is not None else MenorPrimero()
+
+    def seleccionar(self, utxos, objetivo):
+        """Explora en profundidad los subconjuntos de UTXOs, de mayor a menor cantidad."""
+        candidatos = list(reversed(utxos))
+        disponible = sum(utxo.cantidad for utxo in candidatos)
+        if disponible < objetivo:
+            return None
+
+        seleccion = []
+        total = 0
+        mejor = None
+        mejor_total = None
+        i = 0
+
+        for _ in range(self.max_intentos):
+            retroceder = False
+            if total > objetivo + self.tolerancia:
+                retroceder = True
+            elif total < objetivo and (i == len(candidatos) or total + disponible < objetivo):
+                retroceder = True
+            elif total >= objetivo:
+                if mejor is None or total < mejor_total:
+                    mejor = list(seleccion)
+                    mejor_total = total
+                if total == objetivo:
+                    break
+                retroceder = True
+
+            if retroceder:
+                if not seleccion:
+                    break
+                # Regresar los UTXOs omitidos y excluir el último incluido
+                i -= 1
+                while i > seleccion[-1]:
+                    disponible += candidatos[i].cantidad
+                    i -= 1
+                total -= candidatos[i].cantidad
+                seleccion.pop()
+            else:
+                utxo = candidatos[i]
+                disponible -= utxo.cantidad
+                # Si el UTXO anterior tenía la misma cantidad y se excluyó, esta rama ya se exploró
+                if not seleccion or i - 1 == seleccion[-1] or utxo.cantidad != candidatos[i - 1].cantidad:
+                    seleccion.append(i)
+                    total += utxo.cantidad
+            i += 1
+
+        if mejor is None:
+            return self.respaldo.seleccionar(utxos, objetivo)
+        return [candidatos[j] for j in mejor]
+
+
+class RandomImprove(EstrategiaSeleccion):
+    """
+    Selecciona UTXOs al azar hasta cubrir el objetivo y después agrega más UTXOs al azar
+    mientras acerquen el total al doble del objetivo, para que el cambio sea de tamaño similar al pago.
+    Parámetros:
+        semilla: Semilla del generador aleatorio, útil para reproducir simulaciones.
+    """
+    def __init__(self, semilla=None):
+
+        self.rng = random.Random(semilla)
+
+    def seleccionar(self, utxos, objetivo):
+        """Selección aleatoria seguida de una fase de mejora hacia el doble del objetivo."""
+        candidatos = list(utxos)
+        self.rng.shuffle(candidatos)
+
+        seleccionados = []
+        total = 0
+        while candidatos and total < objetivo:
+            utxo = candidatos.pop()
+            seleccionados.append(utxo)
+            total += utxo.cantidad
+        if total < objetivo:
+            return None
+
+        ideal = 2 * objetivo
+        maximo = 3 * objetivo
+        for utxo in candidatos:
+            nuevo_total = total + utxo.cantidad
+            if abs(ideal - nuevo_total) < abs(ideal - total) and nuevo_total <= maximo:
+                seleccionados.append(utxo)
+                total = nuevo_total
+        return seleccionados
+
+
+ESTRATEGIAS = {
+    "menor_primero": MenorPrimero,
+    "mayor_primero": MayorPrimero,
+    "branch_and_bound": BranchAndBound,
+    "random_improve": RandomImprove,
+}
@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+from urllib.parse import urlsplit
+
+from src.Sistema import Sistema
+from src.Transaccion import cantidad_valida
+
+class ServidorRPC:
+    """
+    Servidor local JSON sobre HTTP/1.1 (asyncio) para operar un Sistema como servicio.
+    Todas las peticiones que tocan el sistema se serializan con un candado. La búsqueda del nonce
+    se ejecuta en un hilo aparte sin el candado, así que mientras se mina se siguen admitiendo
+    transacciones (el minero refresca su plantilla); el candado solo se toma para crear la plantilla
+    y para confirmar el bloque, y un segundo candado evita que dos peticiones minen a la vez.
+    Parámetros:
+        sistema: Sistema de blockchain que atiende el servidor.
+        host: Dirección en la que escucha el servidor.
+        puerto: Puerto en el que escucha el servidor.
+        silencioso: Si es True, se descartan los mensajes que imprime el sistema.
+    Rutas:
+        GET  /estado: Resumen del sistema.
+        GET  /usuarios: Lista de usuarios (índice y dirección).
+        POST /usuarios: Crea un usuario.
+        POST /tx: Envía una transacción {"emisor", "receptor", "cantidad"}.
+        POST /tx/lote: Envía una lista de transacciones.
+        GET  /saldo/<usuario>: Saldo total y disponible de un usuario (índice o dirección).
+        GET  /utxos/<usuario>: UTXOs de un usuario.
+        GET  /bloque/<altura o hash>: Bloque de la cadena.
+        POST /minar: Mina un bloque {"minero"}; las transacciones que lleguen mientras tanto pueden incluirse.
+    """
+    def __init__(self, sistema, host="127.0.0.1", puerto=8545, silencioso=False):
+
+        self.sistema = sistema
+        self.host = host
+        self.puerto = puerto
+        self.silencioso = silencioso
+        self.candado = None
+        self.candado_minado = None
+        self.servidor = None
+
+    async def iniciar(self):
+        """Abre el socket del servidor."""
+        self.candado = asyncio.Lock()
+        self.candado_minado = asyncio.Lock()
+        self.servidor = await asyncio.start_server(self.atender_conexion, self.host, self.puerto)
+        self.puerto = self.servidor.sockets[0].getsockname()[1]
+        print(f"Servidor RPC escuchando en http://{self.host}:{self.puerto}")
+
+    async def servir(self):
+        """Inicia el servidor y atiende peticiones indefinidamente."""
+        await self.iniciar()
+        async with self.servidor:
+            await self.servidor.serve_forever()
+
+    async def cerrar(self):
+        """Cierra el servidor."""
+        self.servidor.close()
+        await self.servidor.wait_closed()
+
+    async def atender_conexion(self, reader, writer):
+        """Atiende las peticiones de una conexión (keep-alive) hasta que el cliente la cierre."""
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+
+                metodo, ruta, _ = linea.decode().split(" ", 2)
+                encabezados = {}
+                while True:
+                    linea = await reader.readline()
+                    if linea in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, valor = linea.decode().split(":", 1)
+                    encabezados[nombre.strip().lower()] = valor.strip()
+
+                longitud = int(encabezados.get("content-length", 0))
+                cuerpo = await reader.readexactly(longitud) if longitud else b""
+
+                estado, respuesta = await self.despachar(metodo, urlsplit(ruta).path, cuerpo)
+                datos = json.dumps(respuesta).encode()
+                writer.write(
+                    f"HTTP/1.1 {estado}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(datos)}\r\n"
+                    f"Connection: keep-alive\r\n\r\n".encode() + datos
+                )
+                await writer.drain()
+
+                if encabezados.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def despachar(self, metodo, ruta, cuerpo):
+        """Ejecuta la ruta solicitada y devuelve el estado HTTP y la respuesta."""
+        try:
+            datos = json.loads(cuerpo) if cuerpo else None
+        except json.JSONDecodeError:
+            return "400 Bad Request", {"error": "El cuerpo no es JSON válido."}
+
+        partes = [p for p in ruta.split("/") if p]
+        if metodo == "POST" and partes == ["minar"]:
+            try:
+                return "200 OK", await self.minar(datos)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                return "400 Bad Request", {"error": str(e)}
+
+        async with self.candado:
+            try:
+                with self.salida():
+                    if metodo == "GET" and partes == ["estado"]:
+                        return "200 OK", self.estado()
+                    if metodo == "GET" and partes == ["usuarios"]:
+                        return "200 OK", [{"idx": u.idx, "direccion": u.direccion} for u in self.sistema.usuarios]
+                    if metodo == "POST" and partes == ["usuarios"]:
+                        usuario = self.sistema.crear_usuario()
+                        return "200 OK", {"idx": usuario.idx, "direccion": usuario.direccion}
+                    if metodo == "POST" and partes == ["tx"]:
+                        return "200 OK", self.enviar_tx(datos)
+                    if metodo == "POST" and partes == ["tx", "lote"]:
+                        return "200 OK", self.enviar_lote(datos)
+                    if metodo == "GET" and len(partes) == 2 and partes[0] == "saldo":
+                        return "200 OK", self.saldo(partes[1])
+                    if metodo == "GET" and len(partes) == 2 and partes[0] == "utxos":
+                        usuario = self.buscar_usuario(partes[1])
+                        return "200 OK", [u.generar_dict() for u in self.sistema.UTXOs_set if u.propietario == usuario.direccion]
+                    if metodo == "GET" and len(partes) == 2 and partes[0] == "bloque":
+                        return "200 OK", self.bloque(partes[1])
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                return "400 Bad Request", {"error": str(e)}
+
+        return "404 Not Found", {"error": f"Ruta desconocida: {metodo} {ruta}"}
+
+    async def minar(self, datos):
+        """
+        Mina un bloque sin bloquear el sistema mientras se busca el nonce.
+        Si la plantilla queda obsoleta al confirmar, se vuelve a minar.
+        """
+        if datos is None:
+            datos = {}
+        if not isinstance(datos, dict):
+            raise TypeError("El cuerpo de /minar debe ser un objeto JSON.")
+
+        loop = asyncio.get_running_loop()
+        async with self.candado_minado:
+            while True:
+                async with self.candado:
+                    with self.salida():
+                        minero = self.buscar_usuario(datos.get("minero", 0))
+                        minado = self.sistema.crear_bloque_plantilla(minero)
+
+                minado = await loop.run_in_executor(None, self.sistema.buscar_prueba_trabajo, minero, *minado)
+
+                async with self.candado:
+                    with self.salida():
+                        bloque = self.sistema.confirmar_bloque(*minado)
+                        if bloque is not None:
+                            return self.bloque_dict(bloque)
+
+    def salida(self):
+        """Devuelve el contexto que descarta lo que imprime el sistema si el servidor es silencioso."""
+        if self.silencioso:
+            return contextlib.redirect_stdout(io.StringIO())
+        return contextlib.nullcontext()
+
+    def buscar_usuario(self, referencia):
+        """Busca un usuario por su índice o su dirección."""
+        if isinstance(referencia, int) or str(referencia).isdigit():
+            if int(referencia) < 0:
+                raise IndexError(f"Usuario no encontrado: {referencia}")
+            return self.sistema.usuarios[int(referencia)]
+
+        for usuario in self.sistema.usuarios:
+            if usuario.direccion == referencia:
+                return usuario
+        raise KeyError(f"Usuario no encontrado: {referencia}")
+
+    def resolver_tx(self, datos):
+        """Obtiene el emisor, el receptor y la cantidad de una transacción recibida."""
+        if not isinstance(datos, dict):
+            raise TypeError("La transacción debe ser un objeto JSON.")
+        emisor = self.buscar_usuario(datos["emisor"])
+        receptor = self.buscar_usuario(datos["receptor"])
+        cantidad = float(datos["cantidad"])
+        if not cantidad_valida(cantidad):
+            raise ValueError(f"Cantidad inválida: {datos['cantidad']}")
+        return emisor, receptor, cantidad
+
+    def enviar_tx(self, datos):
+        """Envía una transacción a la mempool y devuelve el resultado."""
+        return self.procesar(*self.resolver_tx(datos))
+
+    def enviar_lote(self, lote):
+        """
+        Envía una lista de transacciones. Todas se resuelven antes de enviar la primera, así que
+        una entrada mal formada rechaza el lote completo sin tocar la mempool.
+        Devuelve un resultado por transacción.
+        """
+        if not isinstance(lote, list):
+            raise TypeError("El lote debe ser una lista de transacciones.")
+
+        resueltas = []
+        for i, datos in enumerate(lote):
+            try:
+                resueltas.append(self.resolver_tx(datos))
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                raise ValueError(f"Transacción {i} del lote inválida: {e}") from e
+
+        return [self.procesar(*tx) for tx in resueltas]
+
+    def procesar(self, emisor, receptor, cantidad):
+        """Procesa una transacción ya resuelta y devuelve su resultado."""
+        transaccion = self.sistema.procesar_tx(emisor, receptor, cantidad)
+        if not transaccion:
+            return {"ok": False}
+        return {"ok": True, "txid": transaccion.txid}
+
+    def saldo(self, referencia):
+        """Devuelve el saldo total y el saldo disponible (sin UTXOs reservados) de un usuario."""
+        usuario = self.buscar_usuario(referencia)
+        return {
+            "direccion": usuario.direccion,
+            "saldo": usuario.checar_cartera(self.sistema.UTXOs_set),
+            "disponible": sum(u.cantidad for u in self.sistema.indice_utxos.get(usuario.direccion)),
+        }
+
+    def bloque(self, referencia):
+        """Devuelve un bloque por su altura o por su hash."""
+        if referencia.isdigit():
+            return self.bloque_dict(self.sistema.blockchain[int(referencia)])
+
+        for bloque in reversed(self.sistema.blockchain):
+            if bloque.hash == referencia:
+                return self.bloque_dict(bloque)
+        raise KeyError(f"Bloque no encontrado: {referencia}")
+
+    def bloque_dict(self, bloque):
+        """Crea un diccionario con el bloque, su hash y sus transacciones (aunque esté podado)."""
+        bloque_dict = bloque.crear_dict()
+        bloque_dict["hash"] = bloque.hash
+        bloque_dict["transacciones"] = self.sistema.get_transacciones_bloque(bloque.idx)
+        return bloque_dict
+
+    def estado(self):
+        """Devuelve un resumen del sistema."""
+        return {
+            "usuarios": len(self.sistema.usuarios),
+            "bloques": len(self.sistema.blockchain),
+            "mempool": len(self.sistema.mempool),
+            "utxos": len(self.sistema.UTXOs_set),
+            "dificultad": self.sistema.dificultad,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor RPC local para el simulador de blockchain.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8545)
+    parser.add_argument("--dificultad", type=int, default=4)
+    parser.add_argument("--silencioso", action="store_true", help="No imprimir los mensajes del sistema.")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()) if args.silencioso else contextlib.nullcontext():
+        sistema = Sistema(dificultad=args.dificultad)
+    servidor = ServidorRPC(sistema, args.host, args.puerto, args.silencioso)
+    try:
+        asyncio.run(servidor.servir())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,11 @@
+import math
 import time
 from src.Usuario import Usuario
 from src.UTXO import UTXO
-from src.Transaccion import Transaccion
-from src.Bloque import Bloque
+from src.Transaccion import Transaccion, cantidad_valida
+from src.Bloque import Bloque, COMPROMISO_VACIO, calcular_compromiso, cerrar_compromiso, extender_compromiso
+from src.IndiceUTXO import IndiceUTXO
+from src.SeleccionUTXO import MenorPrimero
 
 class Sistema:
     """Clase que representa el sistema de blockchain.
@@ -14,30 +17,59 @@ class Sistema:
         usuarios: Lista de usuarios registrados en el sistema.
         blockchain: Lista que representa la cadena de bloques.
         UTXOs_set: Conjunto de UTXOs disponibles en el sistema.
+        indice_utxos: UTXOs de cada usuario ordenados por cantidad, sin los reservados por la mempool.
+        estrategia_seleccion: Estrategia de selección de UTXOs usada por las transacciones.
+        umbral_consolidacion: Número de UTXOs disponibles a partir del cual se consolidan automáticamente, None lo desactiva.
         transacciones: Lista de transacciones realizadas en el sistema.
         mempool: Lista de transacciones pendientes de ser minadas.
+        plantilla: Plantilla del siguiente bloque, se actualiza con cada transacción de la mempool
+            (transacciones, número de transacciones, total de tarifas, compromiso acumulado y versión).
         recompensas: Lista de recompensas obtenidas por minar bloques.
         fees: Lista de tarifas de minería acumuladas.
         idx_usuario: Índice para identificar usuarios de manera única.
         idx_tx: Índice para identificar transacciones de manera única.
         idx_bloque: Índice para identificar bloques de manera única.
         idx_utxo: Índice para identificar UTXOs de manera única.
+        profundidad_poda: Número de bloques recientes que conservan sus transacciones en memoria, None desactiva la poda.
+        directorio_poda: Directorio donde se guardan las transacciones de los bloques podados, None las descarta.
+        altura_podada: Índice del siguiente bloque pendiente de podar.
+        datos_deshacer: Datos para revertir cada bloque no podado (UTXOs gastados y creados, transacciones y coinbase), por hash.
     Métodos:
         agregar_usuario: Agrega un nuevo usuario al sistema.
         crear_usuario: Crea un nuevo usuario y lo agrega al sistema.
         agregar_bloque: Agrega un bloque a la cadena de bloques.
+        podar_bloques: Descarta las transacciones de los bloques más antiguos que la profundidad de poda.
+        get_transacciones_bloque: Devuelve las transacciones de un bloque, aunque haya sido podado.
         get_utxo_idx: Genera un identificador único para un UTXO.
+        agregar_utxo: Agrega un UTXO al conjunto de UTXOs y al índice por usuario.
+        eliminar_utxo: Elimina un UTXO del conjunto de UTXOs y del índice por usuario.
+        reservar_utxos: Retira del índice los UTXOs gastados por una transacción de la mempool.
+        liberar_utxos: Regresa al índice UTXOs que dejaron de estar reservados.
+        consolidar_utxos: Junta los UTXOs más pequeños de un usuario en una transacción hacia sí mismo.
         agregar_tx: Agrega una transacción al sistema.
-        procesar_tx: Procesa una transacción entre un emisor y un receptor.
+        procesar_tx: Procesa una transacción entre un emisor y un receptor, devuelve la transacción admitida o False.
         get_cartera: Devuelve un diccionario con las direcciones de los usuarios y sus saldos.
         crear_coinbase_tx: Crea una transacción de coinbase para el minero.
+        actualizar_plantilla: Agrega una transacción admitida a la plantilla del siguiente bloque.
+        reconstruir_plantilla: Reconstruye la plantilla a partir de la mempool.
         get_mining_fees: Calcula las tarifas de minería acumuladas en la mempool.
+        crear_bloque_plantilla: Crea el bloque a minar a partir de la plantilla actual.
         minar_bloque: Minera un bloque y lo agrega a la cadena de bloques.
+        buscar_prueba_trabajo: Busca el nonce de un bloque, refrescando la plantilla si llegan transacciones.
+        confirmar_bloque: Agrega a la cadena un bloque minado y aplica sus transacciones.
+        quitar_tx: Quita una transacción reciente del sistema.
+        desconectar_bloque: Revierte el último bloque de la cadena y regresa sus transacciones a la mempool.
+        validar_encabezado: Verifica el enlace, la prueba de trabajo y el compromiso de un bloque recibido.
+        conectar_bloque: Valida y aplica un bloque recibido sobre la punta de la cadena.
+        reorganizar: Cambia la punta de la cadena por una rama competidora más larga.
         crear_bloque_genesis: Crea el bloque génesis y el usuario génesis.
+        validar_cadena: Verifica los enlaces, hashes y prueba de trabajo de la cadena de bloques.
         crear_json: Crea un diccionario con los atributos del sistema.
+        __setstate__: Completa y reconstruye los atributos que faltan al cargar sistemas guardados con versiones anteriores.
     """
     
-    def __init__(self, dificultad=4):
+    def __init__(self, dificultad=4, profundidad_poda=None, directorio_poda=None,
+                 estrategia_seleccion=None, umbral_consolidacion=None):
 
         # Minado
         self.dificultad = dificultad
@@ -47,18 +79,59 @@ class Sistema:
         self.usuarios = []
         self.blockchain = []
         self.UTXOs_set = []
+        self.indice_utxos = IndiceUTXO()
         self.transacciones = []
         self.mempool = []               # transacciones pendientes
+        self.plantilla = None
+        self.reconstruir_plantilla()
         self.recompensas = []
         self.fees = []
 
+        # Selección de UTXOs
+        self.estrategia_seleccion = estrategia_seleccion if estrategia_seleccion is not None else MenorPrimero()
+        self.umbral_consolidacion = umbral_consolidacion
+
         # Índices
         self.idx_usuario = 0
         self.idx_tx = 0
         self.idx_bloque = 0
         self.idx_utxo = 0
+
+        # Poda
+        if profundidad_poda is not None and profundidad_poda < 1:
+            raise ValueError("La profundidad de poda debe ser al menos 1.")
+        self.profundidad_poda = profundidad_poda
+        self.directorio_poda = directorio_poda
+        self.altura_podada = 0
+        self.datos_deshacer = {}
+
         self.primer_usuario = self.crear_bloque_genesis()
 
+    def __setstate__(self, estado):
+        """
+        Completa los atributos que faltan al cargar un sistema guardado (pickle) con una versión anterior
+        y reconstruye el índice de UTXOs y la plantilla a partir del conjunto de UTXOs y la mempool.
+        """
+        self.__dict__.update(estado)
+        self.__dict__.setdefault("profundidad_poda", None)
+        self.__dict__.setdefault("directorio_poda", None)
+        self.__dict__.setdefault("altura_podada", 0)
+        self.__dict__.setdefault("datos_deshacer", {})
+        self.__dict__.setdefault("umbral_consolidacion", None)
+        if "estrategia_seleccion" not in estado:
+            self.estrategia_seleccion = MenorPrimero()
+
+        if "indice_utxos" not in estado:
+            self.indice_utxos = IndiceUTXO()
+            for utxo in self.UTXOs_set:
+                self.indice_utxos.agregar(utxo)
+            for tx_entry in self.mempool:
+                self.reservar_utxos(tx_entry["tx_obj"].UTXO_seleccionados)
+
+        if "plantilla" not in estado:
+            self.plantilla = None
+            self.reconstruir_plantilla()
+
 
     def agregar_usuario(self, usuario):
         """
@@ -84,6 +157,41 @@ class Sistema:
         self.blockchain.append(bloque)
         self.idx_bloque += 1
         print(f"Bloque {bloque.idx} agregado a la cadena de bloques.")
+        self.podar_bloques()
+
+    def podar_bloques(self):
+        """
+        Descarta las transacciones de los bloques más antiguos que la profundidad de poda.
+        Se conservan los encabezados de todos los bloques y el conjunto de UTXOs, de modo que
+        la memoria queda acotada por los UTXOs y la ventana de bloques recientes.
+        """
+        if self.profundidad_poda is None:
+            return
+
+        limite = len(self.blockchain) - self.profundidad_poda
+        txids_podados = set()
+
+        while self.altura_podada < limite:
+            bloque = self.blockchain[self.altura_podada]
+            txids_podados.update(tx["txid"] for tx in bloque.transacciones)
+            bloque.podar(self.directorio_poda)
+            self.datos_deshacer.pop(bloque.hash, None)
+            self.altura_podada += 1
+
+        if txids_podados:
+            self.transacciones = [tx for tx in self.transacciones if tx.txid not in txids_podados]
+            print(f"Bloques podados hasta la altura {self.altura_podada - 1}.")
+
+    def get_transacciones_bloque(self, idx):
+        """
+        Devuelve las transacciones de un bloque, leyéndolas de disco si el bloque fue podado.
+        Devuelve None si el bloque no existe o si sus transacciones se descartaron.
+        """
+        if idx < 0 or idx >= len(self.blockchain):
+            print(f"Error: el bloque {idx} no existe.")
+            return None
+
+        return self.blockchain[idx].cargar_transacciones()
     
     def get_utxo_idx(self):
         """
@@ -92,6 +200,63 @@ class Sistema:
         utxo_idx = self.idx_utxo
         self.idx_utxo += 1
         return str(utxo_idx)
+
+    def agregar_utxo(self, utxo):
+        """
+        Agrega un UTXO al conjunto de UTXOs y al índice por usuario.
+        """
+        self.UTXOs_set.append(utxo)
+        self.indice_utxos.agregar(utxo)
+
+    def eliminar_utxo(self, utxo):
+        """
+        Elimina un UTXO del conjunto de UTXOs y del índice por usuario (si no estaba reservado).
+        """
+        self.UTXOs_set.remove(utxo)
+        self.indice_utxos.eliminar(utxo)
+
+    def reservar_utxos(self, utxos):
+        """
+        Retira del índice los UTXOs gastados por una transacción de la mempool,
+        para que otra transacción pendiente no los vuelva a seleccionar.
+        """
+        for utxo in utxos:
+            self.indice_utxos.eliminar(utxo)
+
+    def liberar_utxos(self, utxos):
+        """
+        Regresa al índice UTXOs que dejaron de estar reservados por la mempool.
+        """
+        for utxo in utxos:
+            self.indice_utxos.agregar(utxo)
+
+    def consolidar_utxos(self, usuario, max_entradas=None):
+        """
+        Junta los UTXOs más pequeños de un usuario en un solo UTXO (total menos la tarifa),
+        para reducir el número de UTXOs que se recorren en las siguientes selecciones.
+        """
+        utxos = self.indice_utxos.get(usuario.direccion)
+        if max_entradas is not None:
+            utxos = utxos[:max_entradas]
+        if len(utxos) < 2:
+            print(f"No hay UTXOs suficientes para consolidar de {usuario.direccion}.")
+            return False
+
+        total = 0
+        for utxo in utxos:
+            total += utxo.cantidad
+
+        # La cantidad más la tarifa no debe exceder el total por errores de redondeo
+        cantidad = total - self.mining_fee
+        while cantidad + self.mining_fee > total:
+            cantidad = math.nextafter(cantidad, 0)
+
+        if cantidad <= 0:
+            print(f"Los UTXOs de {usuario.direccion} no cubren la tarifa de consolidación.")
+            return False
+
+        print(f"Consolidando {len(utxos)} UTXOs de {usuario.direccion}.")
+        return self.procesar_tx(usuario, usuario, cantidad, estrategia=MenorPrimero())
     
     def agregar_tx(self, transaccion):
         """Agrega una transacción al sistema.
@@ -103,14 +268,18 @@ class Sistema:
         else:
             print(f"Transacción de {transaccion.emisor.direccion} a {transaccion.receptor.direccion} por {transaccion.cantidad} agregada al sistema.")
     
-    def procesar_tx(self, sender, receiver, amount):
-        
+    def procesar_tx(self, sender, receiver, amount, estrategia=None):
+        """
+        Valida una transacción y la agrega a la mempool.
+        Devuelve la transacción admitida, o False si no es válida.
+        """
         transaccion = Transaccion(
             idx=self.idx_tx,
             emisor=sender,
             receptor=receiver,
             cantidad=amount,
             sistema=self,
+            estrategia=estrategia,
         )
         tx_dict = transaccion.validar_y_preparar_tx()
 
@@ -120,9 +289,14 @@ class Sistema:
                 "tx_obj": transaccion,
                 "tx_dict": tx_dict,
             })
+            self.reservar_utxos(transaccion.UTXO_seleccionados)
+            self.actualizar_plantilla(tx_dict)
             self.idx_tx += 1
             print(f"Transacción {transaccion.txid} procesada y agregada a la mempool.")
-            return True
+
+            if self.umbral_consolidacion is not None and self.indice_utxos.contar(sender.direccion) > self.umbral_consolidacion:
+                self.consolidar_utxos(sender, max_entradas=self.umbral_consolidacion)
+            return transaccion
         else:
             print("Error al procesar la transacción.")
             return False
@@ -138,12 +312,17 @@ class Sistema:
             cartera[f'Usuario {usuario.idx}'] = [usuario.direccion, saldo]
         return cartera
     
-    def crear_coinbase_tx(self, minero, cantidad):
+    def crear_coinbase_tx(self, minero, cantidad, idx=None):
         """
         Crea una transacción de coinbase para el minero.
+        Cada coinbase consume un idx propio para que dos coinbase al mismo minero por la misma
+        cantidad no tengan el mismo txid; al refrescar la plantilla se reutiliza el idx ya tomado.
         """
+        if idx is None:
+            idx = self.idx_tx
+            self.idx_tx += 1
         coinbase_tx = Transaccion(
-            idx=self.idx_tx,
+            idx=idx,
             emisor=None,
             receptor=minero,
             cantidad=cantidad,
@@ -151,54 +330,410 @@ class Sistema:
         )
         return coinbase_tx
     
-    def get_mining_fees(self):
-        total = sum(tx["tx_dict"]["mining_fee"] for tx in self.mempool if tx["tx_dict"]["emisor"] is not None)
-        return total
+    def actualizar_plantilla(self, tx_dict):
+        """
+        Agrega una transacción admitida a la plantilla del siguiente bloque, actualizando
+        el total de tarifas y el compromiso acumulado sin recorrer la mempool.
+        La plantilla se reemplaza completa para que un minado en curso siempre lea un estado consistente.
+        """
+        plantilla = self.plantilla
+        plantilla["transacciones"].append(tx_dict)
+        self.plantilla = {
+            "transacciones": plantilla["transacciones"],
+            "num_transacciones": plantilla["num_transacciones"] + 1,
+            "fees": plantilla["fees"] + tx_dict["mining_fee"],
+            "compromiso": extender_compromiso(plantilla["compromiso"], tx_dict),
+            "version": plantilla["version"] + 1,
+        }
 
-    def minar_bloque(self, minero):
-        cantidad_coinbase = self.mining_reward + self.get_mining_fees()
-        coinbase_tx = self.crear_coinbase_tx(minero, cantidad_coinbase)
-        coinbase_tx.validar_y_preparar_tx()
+    def reconstruir_plantilla(self):
+        """
+        Reconstruye la plantilla a partir de la mempool. Se usa cuando la mempool cambia
+        por algo distinto a una transacción nueva (minado, desconexión o conexión de bloques).
+        """
+        version = self.plantilla["version"] + 1 if self.plantilla is not None else 0
+        self.plantilla = {
+            "transacciones": [],
+            "num_transacciones": 0,
+            "fees": 0,
+            "compromiso": COMPROMISO_VACIO,
+            "version": version,
+        }
+        for tx_entry in self.mempool:
+            self.actualizar_plantilla(tx_entry["tx_dict"])
 
-        transacciones_bloque = [coinbase_tx.crear_dict()] + [tx["tx_dict"] for tx in self.mempool]
+    def get_mining_fees(self):
+        return self.plantilla["fees"]
 
-        bloque_anterior = self.blockchain[-1]
-        hash_anterior = bloque_anterior.hash
-        idx_bloque = self.idx_bloque
+    def crear_bloque_plantilla(self, minero, idx_coinbase=None):
+        """
+        Crea el bloque a minar a partir de la plantilla actual. Solo se crea la coinbase
+        y se cierra el compromiso, así que el costo no depende del tamaño de la mempool.
+        Devuelve el bloque, la transacción coinbase y la plantilla usada.
+        """
+        plantilla = self.plantilla
+        cantidad_coinbase = self.mining_reward + plantilla["fees"]
+        coinbase_tx = self.crear_coinbase_tx(minero, cantidad_coinbase, idx_coinbase)
+        coinbase_dict = coinbase_tx.validar_y_preparar_tx()
 
         nuevo_bloque = Bloque(
-            idx=idx_bloque,
-            transacciones=transacciones_bloque,
-            previous_hash=hash_anterior
+            idx=self.idx_bloque,
+            transacciones=[coinbase_dict],
+            previous_hash=self.blockchain[-1].hash,
+            compromiso=cerrar_compromiso(coinbase_dict, plantilla["compromiso"])
         )
+        nuevo_bloque.recompensa = cantidad_coinbase
+        nuevo_bloque.hash = nuevo_bloque.calcular_hash()
+
+        return nuevo_bloque, coinbase_tx, plantilla
 
+    def minar_bloque(self, minero, intervalo_refresco=1000):
+        """
+        Mina un bloque con la plantilla actual y lo agrega a la cadena de bloques.
+        Equivale a crear_bloque_plantilla, buscar_prueba_trabajo y confirmar_bloque seguidos;
+        quien necesite admitir transacciones durante el minado (el servidor RPC) llama
+        los tres pasos por separado y solo bloquea el sistema al crear y al confirmar.
+        """
+        minado = self.crear_bloque_plantilla(minero)
+        minado = self.buscar_prueba_trabajo(minero, *minado, intervalo_refresco=intervalo_refresco)
+        return self.confirmar_bloque(*minado)
+
+    def buscar_prueba_trabajo(self, minero, nuevo_bloque, coinbase_tx, plantilla, intervalo_refresco=1000):
+        """
+        Busca el nonce del bloque creado por crear_bloque_plantilla.
+        Cada intervalo_refresco intentos se revisa si la plantilla cambió (llegaron transacciones
+        durante el minado) y, en ese caso, se continúa con la plantilla nueva y la misma coinbase.
+        Solo lee el sistema, así que puede correr en otro hilo mientras se admiten transacciones.
+        Devuelve el bloque minado, su coinbase y la plantilla usada.
+        """
         start_time = time.time()
 
         while not nuevo_bloque.hash.startswith('0' * self.dificultad):
             nuevo_bloque.nonce += 1
+            if nuevo_bloque.nonce % intervalo_refresco == 0 and self.plantilla["version"] != plantilla["version"]:
+                nuevo_bloque, coinbase_tx, plantilla = self.crear_bloque_plantilla(minero, coinbase_tx.idx)
             nuevo_bloque.hash = nuevo_bloque.calcular_hash()
 
         end_time = time.time()
         nuevo_bloque.tiempo_minado = round(end_time - start_time, 2)
-        nuevo_bloque.recompensa = cantidad_coinbase
+        return nuevo_bloque, coinbase_tx, plantilla
+
+    def confirmar_bloque(self, nuevo_bloque, coinbase_tx, plantilla):
+        """
+        Agrega a la cadena un bloque minado por buscar_prueba_trabajo y aplica sus transacciones.
+        Devuelve None si la punta de la cadena o el inicio de la mempool cambiaron desde que se
+        creó la plantilla (otro bloque se confirmó o desconectó mientras tanto).
+        """
+        num_txs = plantilla["num_transacciones"]
+        txs_bloque = self.mempool[:num_txs]
+        vigente = nuevo_bloque.previous_hash == self.blockchain[-1].hash and len(txs_bloque) == num_txs
+        if not vigente or any(tx_entry["tx_dict"] is not tx_dict for tx_entry, tx_dict in zip(txs_bloque, plantilla["transacciones"])):
+            print(f"Error: la plantilla del bloque {nuevo_bloque.idx} quedó obsoleta, no se confirma.")
+            return None
 
-        coinbase_tx.aplicar_tx()
+        # Solo se confirman las transacciones que estaban en la plantilla minada
+        nuevo_bloque.transacciones.extend(plantilla["transacciones"][:num_txs])
+        nuevo_bloque.num_transacciones = len(nuevo_bloque.transacciones)
+        cantidad_coinbase = nuevo_bloque.recompensa
 
-        for tx_entry in self.mempool:
+        creados = coinbase_tx.aplicar_tx()
+        gastados = []
+
+        for tx_entry in txs_bloque:
             tx_obj = tx_entry["tx_obj"]
-            tx_obj.aplicar_tx()
+            gastados.extend(tx_obj.UTXO_seleccionados)
+            creados.extend(tx_obj.aplicar_tx())
 
+        self.datos_deshacer[nuevo_bloque.hash] = {
+            "gastados": gastados,
+            "creados": creados,
+            "txs": txs_bloque,
+            "coinbase": coinbase_tx,
+        }
         self.agregar_bloque(nuevo_bloque)
         self.agregar_tx(coinbase_tx)
         self.recompensas.append(cantidad_coinbase)
-        self.mempool.clear()
+        del self.mempool[:num_txs]
+        self.reconstruir_plantilla()
         self.fees.clear()
 
-        print(f"Bloque {nuevo_bloque.hash} minado en {nuevo_bloque.tiempo_minado:.2f} segundos, por {minero.direccion}")
+        print(f"Bloque {nuevo_bloque.hash} minado en {nuevo_bloque.tiempo_minado:.2f} segundos, por {coinbase_tx.dir_receptor}")
 
         return nuevo_bloque
 
 
+    def quitar_tx(self, transaccion):
+        """
+        Quita una transacción del sistema. La búsqueda empieza por el final porque
+        solo se quitan transacciones recientes (coinbase desconectadas o descartadas de la mempool).
+        """
+        for i in range(len(self.transacciones) - 1, -1, -1):
+            if self.transacciones[i] is transaccion:
+                del self.transacciones[i]
+                return
+
+    def desconectar_bloque(self):
+        """
+        Revierte el último bloque de la cadena usando sus datos para deshacer.
+        Restaura los UTXOs gastados, elimina los creados y regresa sus transacciones a la mempool,
+        descartando las transacciones pendientes que gastaban UTXOs creados por el bloque.
+        El costo es proporcional al bloque y a la mempool, no al largo de la cadena.
+        """
+        if len(self.blockchain) <= 1:
+            print("Error: no se puede desconectar el bloque génesis.")
+            return None
+
+        bloque = self.blockchain[-1]
+        deshacer = self.datos_deshacer.pop(bloque.hash, None)
+        if deshacer is None:
+            print(f"Error: no hay datos para deshacer el bloque {bloque.idx} (fue podado).")
+            return None
+
+        creados = {id(utxo) for utxo in deshacer["creados"]}
+        for utxo in deshacer["creados"]:
+            self.eliminar_utxo(utxo)
+        for utxo in deshacer["gastados"]:
+            self.agregar_utxo(utxo)
+
+        # Las transacciones pendientes que gastaban salidas del bloque dejan de ser válidas
+        pendientes = []
+        for tx_entry in self.mempool:
+            entradas = tx_entry["tx_obj"].UTXO_seleccionados
+            if any(id(utxo) in creados for utxo in entradas):
+                self.liberar_utxos([utxo for utxo in entradas if id(utxo) not in creados])
+                self.quitar_tx(tx_entry["tx_obj"])
+                print(f"Transacción {tx_entry['tx_dict']['txid']} descartada de la mempool.")
+            else:
+                pendientes.append(tx_entry)
+
+        for tx_entry in deshacer["txs"]:
+            self.reservar_utxos(tx_entry["tx_obj"].UTXO_seleccionados)
+        self.mempool = deshacer["txs"] + pendientes
+        self.reconstruir_plantilla()
+
+        self.quitar_tx(deshacer["coinbase"])
+
+        self.blockchain.pop()
+        self.idx_bloque -= 1
+        self.recompensas.pop()
+
+        print(f"Bloque {bloque.idx} desconectado, {len(deshacer['txs'])} transacciones regresaron a la mempool.")
+        return bloque
+
+    def reconstruir_tx(self, tx_dict, usuarios, entradas):
+        """
+        Crea un objeto Transaccion a partir del diccionario guardado en un bloque.
+        Devuelve None si algún usuario no existe o si el txid o la firma no corresponden a su contenido.
+        """
+        if tx_dict["receptor"] not in usuarios or (tx_dict["emisor"] is not None and tx_dict["emisor"] not in usuarios):
+            return None
+
+        emisor = usuarios[tx_dict["emisor"]] if tx_dict["emisor"] is not None else None
+        transaccion = Transaccion(
+            idx=tx_dict["idx"],
+            emisor=emisor,
+            receptor=usuarios[tx_dict["receptor"]],
+            cantidad=tx_dict["cantidad"],
+            sistema=self,
+        )
+        transaccion.UTXO_seleccionados = entradas
+        transaccion.total_seleccionado = sum(utxo.cantidad for utxo in entradas)
+        transaccion.txid = tx_dict["txid"]
+        transaccion.firma = bytes.fromhex(tx_dict["firma"]) if tx_dict["firma"] else None
+
+        if transaccion.crear_txid() != transaccion.txid or not transaccion.verificar_firma():
+            return None
+        return transaccion
+
+    def validar_encabezado(self, bloque, hash_anterior, idx):
+        """
+        Verifica que un bloque recibido continúe al bloque con hash_anterior en la altura idx,
+        que cumpla la prueba de trabajo y que sus transacciones correspondan a su compromiso.
+        No revisa las transacciones contra los UTXOs; eso lo hace conectar_bloque.
+        """
+        if bloque.previous_hash != hash_anterior or bloque.idx != idx:
+            print(f"Error: el bloque {bloque.idx} no continúa al bloque {hash_anterior}.")
+            return False
+        if bloque.podado or not bloque.transacciones:
+            print(f"Error: el bloque {bloque.idx} no tiene transacciones.")
+            return False
+        if not bloque.hash.startswith('0' * self.dificultad) or bloque.calcular_hash() != bloque.hash:
+            print(f"Error: el hash del bloque {bloque.idx} no es válido.")
+            return False
+        if calcular_compromiso(bloque.transacciones) != bloque.compromiso:
+            print(f"Error: las transacciones del bloque {bloque.idx} no corresponden a su compromiso.")
+            return False
+        return True
+
+    def conectar_bloque(self, bloque):
+        """
+        Valida y aplica un bloque recibido sobre la punta de la cadena, registrando sus datos para deshacer.
+        Las transacciones del bloque que estaban en la mempool se confirman y las que entran
+        en conflicto con él se descartan.
+        """
+        if not self.validar_encabezado(bloque, self.blockchain[-1].hash, self.idx_bloque):
+            return False
+
+        usuarios = {usuario.direccion: usuario for usuario in self.usuarios}
+        pendientes = {tx_entry["tx_dict"]["txid"]: tx_entry for tx_entry in self.mempool}
+
+        # Las entradas reservadas por la mempool se liberan para poder buscarlas en el índice
+        for tx_entry in self.mempool:
+            self.liberar_utxos(tx_entry["tx_obj"].UTXO_seleccionados)
+
+        coinbase_dict, txs_dicts = bloque.transacciones[0], bloque.transacciones[1:]
+        txs = []
+        entradas_txs = []
+        gastados = []
+        usados = set()
+        valido = coinbase_dict["emisor"] is None and all(tx["emisor"] is not None for tx in txs_dicts)
+
+        for tx_dict in txs_dicts if valido else []:
+            entradas = []
+            for info in tx_dict["UTXOs_emisor"]:
+                utxo = self.indice_utxos.buscar(info["direccion"], info["txid"], info["cantidad"], usados)
+                if utxo is None or info["direccion"] != tx_dict["emisor"]:
+                    valido = False
+                    break
+                usados.add(id(utxo))
+                entradas.append(utxo)
+            if not valido:
+                break
+
+            # La tarifa no está cubierta por el txid ni por la firma, así que debe ser la del sistema
+            total_entradas = sum(utxo.cantidad for utxo in entradas)
+            if (tx_dict["mining_fee"] != self.mining_fee or not cantidad_valida(tx_dict["cantidad"])
+                    or total_entradas < tx_dict["cantidad"] + tx_dict["mining_fee"]):
+                valido = False
+                break
+
+            if tx_dict["txid"] in pendientes:
+                tx_entry = pendientes[tx_dict["txid"]]
+            else:
+                tx_obj = self.reconstruir_tx(tx_dict, usuarios, entradas)
+                if tx_obj is None:
+                    valido = False
+                    break
+                tx_entry = {"tx_obj": tx_obj, "tx_dict": tx_dict}
+            txs.append(tx_entry)
+            entradas_txs.append(entradas)
+            gastados.extend(entradas)
+
+        if valido:
+            fees = sum(tx["mining_fee"] for tx in txs_dicts)
+            valido = abs(coinbase_dict["cantidad"] - (self.mining_reward + fees)) < 1e-9
+        coinbase_tx = self.reconstruir_tx(coinbase_dict, usuarios, []) if valido else None
+
+        if coinbase_tx is None:
+            for tx_entry in self.mempool:
+                self.reservar_utxos(tx_entry["tx_obj"].UTXO_seleccionados)
+            print(f"Error: el bloque {bloque.idx} contiene transacciones inválidas.")
+            return False
+
+        # Una transacción pendiente puede tener reservado un UTXO gemelo (mismo dueño, txid y cantidad)
+        # del que se encontró en el índice; se aplica con las entradas resueltas para que coincida con gastados
+        for tx_entry, entradas in zip(txs, entradas_txs):
+            tx_entry["tx_obj"].UTXO_seleccionados = entradas
+            tx_entry["tx_obj"].total_seleccionado = sum(utxo.cantidad for utxo in entradas)
+
+        creados = coinbase_tx.aplicar_tx()
+        for tx_entry in txs:
+            creados.extend(tx_entry["tx_obj"].aplicar_tx())
+
+        self.datos_deshacer[bloque.hash] = {
+            "gastados": gastados,
+            "creados": creados,
+            "txs": txs,
+            "coinbase": coinbase_tx,
+        }
+        self.agregar_bloque(bloque)
+        self.agregar_tx(coinbase_tx)
+        # Los idx nuevos no deben repetir los de las transacciones recibidas
+        self.idx_tx = max(self.idx_tx, max(tx["idx"] for tx in bloque.transacciones) + 1)
+        for tx_entry in txs:
+            if tx_entry["tx_dict"]["txid"] not in pendientes:
+                self.agregar_tx(tx_entry["tx_obj"])
+        self.recompensas.append(coinbase_dict["cantidad"])
+        self.fees.clear()
+
+        # Se quitan de la mempool las transacciones confirmadas y las que gastaban las mismas entradas
+        confirmadas = {tx["txid"] for tx in txs_dicts}
+        mempool = []
+        for tx_entry in self.mempool:
+            if tx_entry["tx_dict"]["txid"] in confirmadas:
+                continue
+            if any(id(utxo) in usados for utxo in tx_entry["tx_obj"].UTXO_seleccionados):
+                self.quitar_tx(tx_entry["tx_obj"])
+                print(f"Transacción {tx_entry['tx_dict']['txid']} descartada de la mempool.")
+                continue
+            self.reservar_utxos(tx_entry["tx_obj"].UTXO_seleccionados)
+            mempool.append(tx_entry)
+        self.mempool = mempool
+        self.reconstruir_plantilla()
+
+        return True
+
+    def reorganizar(self, rama):
+        """
+        Cambia la punta de la cadena por una rama competidora (lista de bloques consecutivos)
+        si la cadena resultante es más larga. Antes de desconectar cualquier bloque se revisan los
+        encabezados de toda la rama y que los bloques a desconectar tengan datos para deshacer.
+        Si un bloque de la rama tiene transacciones inválidas, se restaura la cadena original;
+        si la restauración falla, el estado es inconsistente y se lanza RuntimeError.
+        La poda se aplica una sola vez al terminar, haya o no cambiado la cadena.
+        """
+        if not rama:
+            return False
+
+        altura_bifurcacion = None
+        for i in range(len(self.blockchain) - 1, -1, -1):
+            if self.blockchain[i].hash == rama[0].previous_hash:
+                altura_bifurcacion = i
+                break
+        if altura_bifurcacion is None:
+            print("Error: la rama no se bifurca de ningún bloque de la cadena.")
+            return False
+
+        num_desconectar = len(self.blockchain) - 1 - altura_bifurcacion
+        if len(rama) <= num_desconectar:
+            print("La rama no es más larga que la cadena actual, no se reorganiza.")
+            return False
+
+        hash_anterior = rama[0].previous_hash
+        for j, bloque in enumerate(rama):
+            if not self.validar_encabezado(bloque, hash_anterior, altura_bifurcacion + 1 + j):
+                print("Error: la rama contiene un bloque inválido, no se reorganiza.")
+                return False
+            hash_anterior = bloque.hash
+        if any(bloque.hash not in self.datos_deshacer for bloque in self.blockchain[altura_bifurcacion + 1:]):
+            print("Error: la bifurcación es anterior a los bloques podados, no se reorganiza.")
+            return False
+
+        # La poda se suspende durante la reorganización para conservar los datos para deshacer
+        # de los bloques de la rama ya conectados, por si hay que restaurar la cadena original
+        profundidad_poda, self.profundidad_poda = self.profundidad_poda, None
+        try:
+            desconectados = []
+            for _ in range(num_desconectar):
+                desconectados.append(self.desconectar_bloque())
+
+            for j, bloque in enumerate(rama):
+                if not self.conectar_bloque(bloque):
+                    for _ in range(j):
+                        if self.desconectar_bloque() is None:
+                            raise RuntimeError("No se pudo desconectar la rama al restaurar la cadena.")
+                    for bloque_original in reversed(desconectados):
+                        if not self.conectar_bloque(bloque_original):
+                            raise RuntimeError(f"No se pudo reconectar el bloque original {bloque_original.idx} al restaurar la cadena.")
+                    print("Error: la rama contiene transacciones inválidas, se restauró la cadena original.")
+                    return False
+        finally:
+            self.profundidad_poda = profundidad_poda
+            self.podar_bloques()
+
+        print(f"Reorganización completa: {num_desconectar} bloques desconectados y {len(rama)} conectados.")
+        return True
+
     def crear_bloque_genesis(self):
         """
         Crea el bloque génesis y el usuario génesis.
@@ -223,6 +758,31 @@ class Sistema:
 
         return usuario_genesis
     
+    def validar_cadena(self):
+        """
+        Verifica que cada bloque apunte al hash del anterior, que su hash cumpla la dificultad
+        y corresponda a su encabezado y, si conserva sus transacciones, que estas correspondan a su compromiso.
+        """
+        for i, bloque in enumerate(self.blockchain):
+            if i > 0:
+                if bloque.previous_hash != self.blockchain[i - 1].hash:
+                    print(f"Cadena inválida: el bloque {bloque.idx} no apunta al bloque anterior.")
+                    return False
+                if not bloque.hash.startswith('0' * self.dificultad):
+                    print(f"Cadena inválida: el bloque {bloque.idx} no cumple la dificultad.")
+                    return False
+
+            # Los bloques legados podados ya no tienen las transacciones con las que se calculó su hash
+            if not (bloque.hash_legado and bloque.podado) and bloque.calcular_hash() != bloque.hash:
+                print(f"Cadena inválida: el hash del bloque {bloque.idx} no corresponde a su encabezado.")
+                return False
+            if not bloque.podado and calcular_compromiso(bloque.transacciones) != bloque.compromiso:
+                print(f"Cadena inválida: las transacciones del bloque {bloque.idx} no corresponden a su compromiso.")
+                return False
+
+        print(f"Cadena válida con {len(self.blockchain)} bloques.")
+        return True
+
     def crear_json(self):
         """
         Crea un diccionario con los atributos del sistema.
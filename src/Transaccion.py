@@ -1,8 +1,16 @@
 from hashlib import sha256
 import json
+import math
 
 from src.UTXO import UTXO
 
+# Cambios menores a este valor son residuos de redondeo y no generan un UTXO
+CAMBIO_MINIMO = 1e-9
+
+def cantidad_valida(cantidad):
+    """Una transacción solo puede transferir una cantidad finita y positiva."""
+    return isinstance(cantidad, (int, float)) and math.isfinite(cantidad) and cantidad > 0
+
 class Transaccion:
     """Clase que representa una transacción en la red de blockchain.
         Parámetros:
@@ -15,19 +23,20 @@ class Transaccion:
             mining_fee: Tarifa de minería, se suma al total de la transacción.
             cantidad: Cantidad de monedas que se transfieren en la transacción.
             UTXOs_set: Conjunto de UTXOs del sistema, utilizado para verificar y actualizar los UTXOs.
+            estrategia: Estrategia de selección de UTXOs, por defecto la del sistema.
         Métodos:
-            lista_UTXO_emisor: Crea una lista de UTXOs del emisor.
+            lista_UTXO_emisor: Obtiene la lista ordenada de UTXOs disponibles del emisor.
             verificar_tx: Verifica si la transacción es válida.
             seleccionar_utxos: Selecciona los UTXOs necesarios para cubrir la cantidad de la transacción.
             crear_txid: Crea un identificador único para la transacción.
             firmar_tx: Firma la transacción con la llave privada del emisor.
             verificar_firma: Verifica la firma de la transacción con la llave pública del emisor.
             validar_y_preparar_tx: Valida la transacción y la prepara para enviar a la mempool (sin tocar UTXOs_set).
-            aplicar_tx: Aplica los cambios en el UTXOs_set (se llama solo cuando la tx se mina).
+            aplicar_tx: Aplica los cambios en el UTXOs_set (se llama solo cuando la tx se mina) y devuelve los UTXOs creados.
             hacer_tx: Realiza la transacción, actualizando el sistema y los UTXOs (solo se utiliza para crear el bloque genesis).
             crear_dict: Crea un diccionario con los atributos de la transacción.
     """
-    def __init__(self, idx, emisor, receptor, cantidad, sistema):
+    def __init__(self, idx, emisor, receptor, cantidad, sistema, estrategia=None):
 
         self.idx = idx
         self.sistema = sistema
@@ -44,6 +53,7 @@ class Transaccion:
             self.cantidad = cantidad
 
         self.UTXOs_set = sistema.UTXOs_set
+        self.estrategia = estrategia if estrategia is not None else sistema.estrategia_seleccion
         
         self.UTXO_emisor = []
         self.UTXO_seleccionados = []
@@ -52,12 +62,16 @@ class Transaccion:
         self.firma = None
 
     def lista_UTXO_emisor(self):
-        """Crea una lista de UTXOs del emisor."""
-        self.UTXO_emisor = [utxo for utxo in self.UTXOs_set if utxo.propietario == self.dir_emisor]
+        """Obtiene la lista ordenada de UTXOs disponibles del emisor (sin los reservados en la mempool)."""
+        self.UTXO_emisor = self.sistema.indice_utxos.get(self.dir_emisor)
     
     def verificar_tx(self):
         """Verifica si la transacción es válida."""
 
+        if not cantidad_valida(self.cantidad):
+            print('Transacción invalida: la cantidad debe ser positiva.')
+            return False
+
         total_credito = sum(utxo.cantidad for utxo in self.UTXO_emisor)
         
         if total_credito < self.cantidad + self.mining_fee:
@@ -68,21 +82,14 @@ class Transaccion:
 
     def seleccionar_utxos(self):
         """Selecciona los UTXOs necesarios para cubrir la cantidad de la transacción."""
-        utxo_seleccionados = []
-        utxo_emisor = sorted(self.UTXO_emisor, key=lambda x: x.cantidad + self.mining_fee)
-        total = 0
-
-        for utxo in utxo_emisor:
-            utxo_seleccionados.append(utxo)
-            total += utxo.cantidad
-            if total >= self.cantidad + self.mining_fee:
-                break
-        if total < self.cantidad + self.mining_fee:
+        utxo_seleccionados = self.estrategia.seleccionar(self.UTXO_emisor, self.cantidad + self.mining_fee)
+
+        if utxo_seleccionados is None:
             print("Error: saldo insuficiente después de seleccionar UTXOs.")
             return False
             
         self.UTXO_seleccionados = utxo_seleccionados
-        self.total_seleccionado = total
+        self.total_seleccionado = sum(utxo.cantidad for utxo in utxo_seleccionados)
         return True
 
     def crear_txid(self):
@@ -135,24 +142,29 @@ class Transaccion:
         return self.crear_dict()
 
     def aplicar_tx(self):
-        """Aplica los cambios en el UTXOs_set (se llama solo cuando la tx se mina)."""
+        """Aplica los cambios en el UTXOs_set (se llama solo cuando la tx se mina) y devuelve los UTXOs creados."""
         if self.emisor is None:
             utxo_receptor = UTXO(self.txid, self.receptor, self.cantidad)
-            self.UTXOs_set.append(utxo_receptor)
-            return
+            self.sistema.agregar_utxo(utxo_receptor)
+            return [utxo_receptor]
 
         for utxo in self.UTXO_seleccionados:
-            self.UTXOs_set.remove(utxo)
+            self.sistema.eliminar_utxo(utxo)
 
         utxo_receptor = UTXO(self.txid, self.receptor, self.cantidad)
-        self.UTXOs_set.append(utxo_receptor)
+        self.sistema.agregar_utxo(utxo_receptor)
+
+        creados = [utxo_receptor]
 
-        cambio = self.total_seleccionado - self.cantidad
-        if cambio > 0:
+        # La tarifa de minería la cobra el minero en la coinbase, así que se descuenta del cambio
+        cambio = self.total_seleccionado - self.cantidad - self.mining_fee
+        if cambio > CAMBIO_MINIMO:
             utxo_cambio = UTXO(self.txid, self.emisor, cambio)
-            self.UTXOs_set.append(utxo_cambio)
+            self.sistema.agregar_utxo(utxo_cambio)
+            creados.append(utxo_cambio)
 
         self.sistema.fees.append(self.mining_fee)
+        return creados
 
     def hacer_tx(self):
         """Realiza la transacción, actualizando el sistema y los UTXOs."""
@@ -160,7 +172,7 @@ class Transaccion:
         if self.emisor is None:
             self.txid = self.crear_txid()
             utxo_receptor = UTXO(self.txid, self.receptor, self.cantidad)
-            self.UTXOs_set.append(utxo_receptor)
+            self.sistema.agregar_utxo(utxo_receptor)
             self.firmar_tx()
             return True
     
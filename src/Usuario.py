@@ -1,5 +1,4 @@
 from hashlib import sha256
-from ecdsa import SECP256k1, SigningKey, BadSignatureError
 
 class Usuario:
     """
@@ -19,7 +18,9 @@ class Usuario:
         verificar_firma: Verifica la firma de un mensaje con la llave pública del usuario.
     """
     def __init__(self, idx):
-        
+        # ecdsa se importa al crear el primer usuario para no cargarlo al importar el sistema
+        from ecdsa import SECP256k1, SigningKey
+
         self.idx = idx
         self.sign_key = SigningKey.generate(curve=SECP256k1)
         self.key = self.sign_key.get_verifying_key()
@@ -43,6 +44,8 @@ class Usuario:
     
     def verificar_firma(self, mensaje, firma):
         """Verifica la firma de un mensaje con la llave pública del usuario."""
+        from ecdsa import BadSignatureError
+
         try:
             return self.key.verify(firma, mensaje.encode(), hashfunc=sha256)
         except BadSignatureError:
@@ -0,0 +1,30 @@
+from src.Sistema import Sistema
+
+
+def test_plantilla_se_refresca_durante_el_minado():
+    sistema = Sistema(dificultad=1)
+    usuario = sistema.crear_usuario()
+    bloque, coinbase_tx, plantilla = sistema.crear_bloque_plantilla(usuario)
+    bloque.hash = ""
+
+    # La transacción llega después de crear la plantilla, como en el servidor mientras se mina
+    transaccion = sistema.procesar_tx(sistema.primer_usuario, usuario, 5)
+    minado = sistema.buscar_prueba_trabajo(usuario, bloque, coinbase_tx, plantilla, intervalo_refresco=1)
+    bloque = sistema.confirmar_bloque(*minado)
+
+    assert [tx["txid"] for tx in bloque.transacciones[1:]] == [transaccion.txid]
+    assert bloque.transacciones[0]["idx"] == coinbase_tx.idx
+    assert not sistema.mempool
+    assert sistema.validar_cadena()
+
+
+def test_plantilla_obsoleta_no_se_confirma():
+    sistema = Sistema(dificultad=1)
+    usuario = sistema.crear_usuario()
+    minado = sistema.crear_bloque_plantilla(usuario)
+    minado = sistema.buscar_prueba_trabajo(usuario, *minado)
+
+    sistema.minar_bloque(sistema.primer_usuario)
+    assert sistema.confirmar_bloque(*minado) is None
+    assert len(sistema.blockchain) == 2
+    assert sistema.validar_cadena()
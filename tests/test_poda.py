@@ -0,0 +1,126 @@
+import copy
+import os
+import pickle
+
+import pytest
+
+from src.Bloque import calcular_compromiso
+from src.Sistema import Sistema
+
+DATOS = os.path.join(os.path.dirname(__file__), "datos")
+
+
+def cargar(nombre):
+    """Carga un pickle guardado con la versión original del sistema (sin poda ni compromiso)."""
+    with open(os.path.join(DATOS, nombre), "rb") as f:
+        return pickle.load(f)
+
+
+def crear_sistema(profundidad_poda, directorio_poda=None, bloques=5):
+    """Sistema con una transacción por bloque; devuelve también una copia de las transacciones de cada bloque."""
+    sistema = Sistema(dificultad=1, profundidad_poda=profundidad_poda, directorio_poda=directorio_poda)
+    usuario = sistema.crear_usuario()
+    transacciones = {}
+    for _ in range(bloques):
+        sistema.procesar_tx(sistema.primer_usuario, usuario, 1)
+        bloque = sistema.minar_bloque(sistema.primer_usuario)
+        transacciones[bloque.idx] = copy.deepcopy(bloque.transacciones)
+    return sistema, transacciones
+
+
+def test_profundidad_invalida():
+    with pytest.raises(ValueError):
+        Sistema(dificultad=1, profundidad_poda=0)
+
+
+def test_ventana_de_bloques_conservados():
+    sistema, _ = crear_sistema(profundidad_poda=2)
+
+    assert [bloque.podado for bloque in sistema.blockchain] == [True] * 4 + [False] * 2
+    assert sistema.altura_podada == 4
+    assert all(bloque.transacciones is None for bloque in sistema.blockchain[:4])
+    assert set(sistema.datos_deshacer) == {bloque.hash for bloque in sistema.blockchain[4:]}
+    assert sistema.validar_cadena()
+
+
+def test_transacciones_podadas_en_disco(tmp_path):
+    sistema, transacciones = crear_sistema(profundidad_poda=1, directorio_poda=str(tmp_path))
+
+    for idx in range(1, 5):
+        assert sistema.blockchain[idx].podado
+        assert sistema.get_transacciones_bloque(idx) == transacciones[idx]
+        # Leer de disco no regresa las transacciones a memoria
+        assert sistema.blockchain[idx].transacciones is None
+    assert sistema.get_transacciones_bloque(5) == transacciones[5]
+    assert len(os.listdir(tmp_path)) == 5
+
+
+def test_transacciones_podadas_sin_directorio():
+    sistema, transacciones = crear_sistema(profundidad_poda=1)
+
+    assert sistema.get_transacciones_bloque(2) is None
+    assert sistema.get_transacciones_bloque(5) == transacciones[5]
+
+
+def test_validar_cadena_despues_de_guardar_y_cargar(tmp_path):
+    sistema, _ = crear_sistema(profundidad_poda=2, directorio_poda=str(tmp_path))
+    cargado = pickle.loads(pickle.dumps(sistema))
+
+    assert cargado.validar_cadena()
+    assert cargado.altura_podada == sistema.altura_podada
+    assert cargado.get_transacciones_bloque(1) == sistema.get_transacciones_bloque(1)
+
+    cargado.procesar_tx(cargado.primer_usuario, cargado.usuarios[1], 1)
+    cargado.minar_bloque(cargado.primer_usuario)
+    assert sum(not bloque.podado for bloque in cargado.blockchain) == 2
+    assert cargado.validar_cadena()
+
+
+def test_bloque_legado():
+    bloque = cargar("bloque_base.pkl")
+
+    assert bloque.hash_legado
+    assert not bloque.podado
+    assert bloque.num_transacciones == len(bloque.transacciones)
+    assert bloque.compromiso == calcular_compromiso(bloque.transacciones)
+    assert bloque.calcular_hash() == bloque.hash
+
+    # El hash legado cubre las transacciones completas, no el compromiso
+    bloque.transacciones[0]["cantidad"] += 1
+    assert bloque.calcular_hash() != bloque.hash
+
+
+def test_sistema_legado():
+    sistema = cargar("sistema_base.pkl")
+
+    assert sistema.validar_cadena()
+    assert all(bloque.hash_legado for bloque in sistema.blockchain)
+    assert sistema.profundidad_poda is None and sistema.altura_podada == 0
+
+    # La transacción pendiente conserva sus entradas reservadas en el índice
+    pendiente = sistema.mempool[0]["tx_obj"]
+    for utxo in pendiente.UTXO_seleccionados:
+        assert sistema.indice_utxos.posicion(utxo) is None
+    assert sistema.plantilla["num_transacciones"] == 1
+
+    bloque = sistema.minar_bloque(sistema.primer_usuario)
+    assert not bloque.hash_legado
+    assert bloque.num_transacciones == 2
+    assert not sistema.mempool
+    assert sistema.validar_cadena()
+
+    assert sistema.desconectar_bloque() is bloque
+    assert sistema.conectar_bloque(bloque)
+    assert sistema.validar_cadena()
+
+
+def test_podar_sistema_legado(tmp_path):
+    sistema = cargar("sistema_base.pkl")
+    sistema.profundidad_poda = 1
+    sistema.directorio_poda = str(tmp_path)
+    transacciones = copy.deepcopy(sistema.blockchain[1].transacciones)
+
+    sistema.podar_bloques()
+    assert sistema.blockchain[1].podado
+    assert sistema.get_transacciones_bloque(1) == transacciones
+    assert sistema.validar_cadena()
@@ -0,0 +1,190 @@
+import copy
+
+import pytest
+
+from src.Bloque import calcular_compromiso
+from src.Sistema import Sistema
+
+
+def estado(sistema):
+    """Resumen comparable del estado de un sistema."""
+    return (
+        [bloque.hash for bloque in sistema.blockchain],
+        sorted((utxo.txid, round(utxo.cantidad, 9)) for utxo in sistema.UTXOs_set),
+        [tx_entry["tx_dict"]["txid"] for tx_entry in sistema.mempool],
+        sorted((utxo.txid, round(utxo.cantidad, 9)) for lista in sistema.indice_utxos.utxos_por_propietario.values() for utxo in lista),
+        sum(sistema.recompensas),
+    )
+
+
+def reminar(bloque, dificultad):
+    """Recalcula el compromiso y vuelve a minar un bloque modificado."""
+    bloque.compromiso = calcular_compromiso(bloque.transacciones)
+    bloque.nonce = 0
+    bloque.hash = bloque.calcular_hash()
+    while not bloque.hash.startswith('0' * dificultad):
+        bloque.nonce += 1
+        bloque.hash = bloque.calcular_hash()
+    return bloque
+
+
+@pytest.fixture
+def sistema():
+    sistema = Sistema(dificultad=1)
+    a = sistema.crear_usuario()
+    b = sistema.crear_usuario()
+    sistema.procesar_tx(sistema.primer_usuario, a, 100)
+    sistema.minar_bloque(sistema.primer_usuario)
+    sistema.procesar_tx(a, b, 10)
+    return sistema
+
+
+def test_desconectar_y_reconectar(sistema):
+    antes = estado(sistema)
+    bloque = sistema.minar_bloque(sistema.usuarios[2])
+    despues = estado(sistema)
+
+    assert sistema.desconectar_bloque() is bloque
+    assert estado(sistema) == antes
+    assert sistema.conectar_bloque(bloque)
+    assert estado(sistema) == despues
+    assert sistema.validar_cadena()
+
+
+def test_coinbase_repetidas_al_mismo_minero():
+    sistema = Sistema(dificultad=1)
+    u = sistema.crear_usuario()
+    v = sistema.crear_usuario()
+    sistema.minar_bloque(u)
+    sistema.minar_bloque(u)
+    assert len({utxo.txid for utxo in sistema.UTXOs_set if utxo.propietario == u.direccion}) == 2
+
+    assert sistema.procesar_tx(u, v, 5)
+    bloque = sistema.minar_bloque(u)
+    despues = estado(sistema)
+
+    assert sistema.desconectar_bloque() is bloque
+    assert sistema.conectar_bloque(bloque)
+    assert estado(sistema) == despues
+
+
+def test_reorganizacion_exitosa(sistema):
+    b = sistema.usuarios[2]
+    original = sistema.minar_bloque(sistema.usuarios[1])
+    sistema.desconectar_bloque()
+
+    rama = [sistema.minar_bloque(b)]
+    sistema.procesar_tx(b, sistema.usuarios[1], 1)
+    rama.append(sistema.minar_bloque(b))
+    esperado = estado(sistema)
+
+    sistema.desconectar_bloque()
+    sistema.desconectar_bloque()
+    assert sistema.conectar_bloque(original)
+
+    assert sistema.reorganizar(rama)
+    assert estado(sistema) == esperado
+    assert sistema.validar_cadena()
+
+
+def test_rama_con_prueba_de_trabajo_invalida(sistema):
+    rama = [sistema.minar_bloque(sistema.usuarios[2])]
+    sistema.desconectar_bloque()
+    original = sistema.minar_bloque(sistema.usuarios[1])
+    antes = estado(sistema)
+
+    rama[0].hash = 'f' + rama[0].hash[1:]
+    rama.append(copy.copy(rama[0]))
+    assert not sistema.reorganizar(rama)
+    assert estado(sistema) == antes
+    assert sistema.blockchain[-1] is original
+
+
+def test_rama_con_transacciones_invalidas_se_revierte(sistema):
+    b = sistema.usuarios[2]
+    rama = [sistema.minar_bloque(b)]
+    sistema.procesar_tx(b, sistema.usuarios[1], 1)
+    rama.append(sistema.minar_bloque(b))
+    sistema.desconectar_bloque()
+    sistema.desconectar_bloque()
+
+    # El encabezado es válido, pero la cantidad ya no corresponde al txid ni a la firma
+    alterado = copy.copy(rama[1])
+    alterado.transacciones = copy.deepcopy(rama[1].transacciones)
+    alterado.transacciones[1]["cantidad"] = 2
+    reminar(alterado, sistema.dificultad)
+
+    original = sistema.minar_bloque(sistema.usuarios[1])
+    antes = estado(sistema)
+    assert not sistema.reorganizar([rama[0], alterado])
+    assert estado(sistema) == antes
+    assert sistema.blockchain[-1] is original
+    assert sistema.validar_cadena()
+
+
+def test_tarifa_inflada_se_rechaza(sistema):
+    minero = sistema.usuarios[2]
+    bloque = sistema.minar_bloque(minero)
+    sistema.desconectar_bloque()
+    antes = estado(sistema)
+
+    # La tarifa no forma parte del txid, así que se puede inflar junto con una coinbase bien formada
+    alterado = copy.copy(bloque)
+    alterado.transacciones = copy.deepcopy(bloque.transacciones)
+    alterado.transacciones[1]["mining_fee"] = 50
+    coinbase = sistema.crear_coinbase_tx(minero, sistema.mining_reward + 50)
+    alterado.transacciones[0] = coinbase.validar_y_preparar_tx()
+    reminar(alterado, sistema.dificultad)
+
+    assert not sistema.conectar_bloque(alterado)
+    assert estado(sistema) == antes
+
+
+def test_entradas_gemelas_de_una_transaccion_pendiente(sistema):
+    a, b = sistema.usuarios[1], sistema.usuarios[2]
+    sistema.minar_bloque(a)
+    c = sistema.crear_usuario()
+    sistema.procesar_tx(sistema.primer_usuario, c, 10.1)
+    sistema.minar_bloque(sistema.primer_usuario)
+
+    # El cambio del envío a sí mismo es igual a la cantidad: dos UTXOs con el mismo txid, dueño y cantidad
+    sistema.procesar_tx(c, c, 5)
+    sistema.minar_bloque(a)
+    sistema.procesar_tx(c, b, 1)
+    bloque = sistema.minar_bloque(a)
+    despues = estado(sistema)
+
+    assert sistema.desconectar_bloque() is bloque
+    assert sistema.conectar_bloque(bloque)
+    assert estado(sistema) == despues
+    assert sistema.desconectar_bloque() is bloque
+    assert len(sistema.UTXOs_set) == len({id(utxo) for utxo in sistema.UTXOs_set})
+    assert sistema.conectar_bloque(bloque)
+    assert sistema.minar_bloque(a)
+    assert sistema.validar_cadena()
+
+
+def test_rama_mas_larga_que_la_poda_se_revierte(sistema):
+    b = sistema.usuarios[2]
+    rama = []
+    for _ in range(4):
+        sistema.procesar_tx(b, sistema.usuarios[1], 1)
+        rama.append(sistema.minar_bloque(b))
+    for _ in rama:
+        sistema.desconectar_bloque()
+
+    alterado = copy.copy(rama[-1])
+    alterado.transacciones = copy.deepcopy(rama[-1].transacciones)
+    alterado.transacciones[1]["cantidad"] = 2
+    rama[-1] = reminar(alterado, sistema.dificultad)
+
+    original = sistema.minar_bloque(sistema.usuarios[1])
+    sistema.profundidad_poda = 2
+    sistema.podar_bloques()
+    antes = estado(sistema)
+
+    assert not sistema.reorganizar(rama)
+    assert estado(sistema) == antes
+    assert sistema.blockchain[-1] is original
+    assert sistema.altura_podada == len(sistema.blockchain) - 2
+    assert sistema.validar_cadena()
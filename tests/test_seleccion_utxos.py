@@ -0,0 +1,146 @@
+import itertools
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from src.IndiceUTXO import IndiceUTXO
+from src.SeleccionUTXO import BranchAndBound, MayorPrimero, MenorPrimero, RandomImprove
+from src.Sistema import Sistema
+from src.UTXO import UTXO
+
+
+def crear_utxos(cantidades, direccion="a", txid="tx"):
+    """UTXOs de un mismo propietario, ordenados de menor a mayor como los entrega el índice."""
+    propietario = SimpleNamespace(direccion=direccion)
+    return [UTXO(f"{txid}{i}", propietario, cantidad) for i, cantidad in enumerate(sorted(cantidades))]
+
+
+def cantidades(utxos):
+    return sorted(utxo.cantidad for utxo in utxos)
+
+
+@pytest.mark.parametrize("estrategia, objetivo, esperado", [
+    (MenorPrimero(), 3, [1, 2]),
+    (MenorPrimero(), 7, [1, 2, 4]),
+    (MayorPrimero(), 4, [8]),
+    (MayorPrimero(), 10, [4, 8]),
+    (BranchAndBound(), 6, [2, 4]),
+    (BranchAndBound(), 11, [1, 2, 8]),
+])
+def test_seleccion(estrategia, objetivo, esperado):
+    assert cantidades(estrategia.seleccionar(crear_utxos([1, 2, 4, 8]), objetivo)) == esperado
+
+
+@pytest.mark.parametrize("estrategia", [MenorPrimero(), MayorPrimero(), BranchAndBound(), RandomImprove(semilla=0)])
+def test_saldo_insuficiente(estrategia):
+    assert estrategia.seleccionar(crear_utxos([1, 2, 4]), 8) is None
+    assert estrategia.seleccionar([], 1) is None
+
+
+def test_branch_and_bound_usa_el_respaldo_sin_coincidencia_exacta():
+    utxos = crear_utxos([2, 4, 8])
+    assert cantidades(BranchAndBound().seleccionar(utxos, 3)) == [2, 4]
+    assert cantidades(BranchAndBound(respaldo=MayorPrimero()).seleccionar(utxos, 3)) == [8]
+    # Con tolerancia acepta un exceso pequeño antes de recurrir al respaldo
+    assert cantidades(BranchAndBound(tolerancia=1).seleccionar(utxos, 5.5)) == [2, 4]
+
+
+def test_branch_and_bound_contra_fuerza_bruta():
+    rng = random.Random(0)
+    for _ in range(300):
+        valores = [rng.randint(1, 20) for _ in range(rng.randint(1, 9))]
+        objetivo = rng.randint(1, sum(valores))
+        utxos = crear_utxos(valores)
+
+        existe = any(
+            sum(combinacion) == objetivo
+            for n in range(1, len(valores) + 1)
+            for combinacion in itertools.combinations(valores, n)
+        )
+        seleccion = BranchAndBound(respaldo=SimpleNamespace(seleccionar=lambda utxos, objetivo: None)).seleccionar(utxos, objetivo)
+
+        assert (seleccion is not None) == existe, (valores, objetivo)
+        if seleccion is not None:
+            assert sum(utxo.cantidad for utxo in seleccion) == objetivo
+            assert len({id(utxo) for utxo in seleccion}) == len(seleccion)
+
+
+def test_random_improve_cubre_el_objetivo():
+    utxos = crear_utxos([1, 2, 3, 5, 8, 13])
+    for semilla in range(20):
+        seleccion = RandomImprove(semilla=semilla).seleccionar(utxos, 6)
+        total = sum(utxo.cantidad for utxo in seleccion)
+        assert total >= 6
+        assert len({id(utxo) for utxo in seleccion}) == len(seleccion)
+    assert cantidades(utxos) == [1, 2, 3, 5, 8, 13]
+
+
+def test_indice_ordenado_y_busqueda():
+    indice = IndiceUTXO()
+    utxos = crear_utxos([5, 1, 3])
+    gemelo = UTXO(utxos[1].txid, SimpleNamespace(direccion="a"), utxos[1].cantidad)
+    for utxo in reversed(utxos + [gemelo]):
+        indice.agregar(utxo)
+
+    assert [u.cantidad for u in indice.get("a")] == [1, 3, 3, 5]
+    assert indice.contar("b") == 0
+
+    encontrado = indice.buscar("a", utxos[1].txid, 3)
+    assert encontrado in (utxos[1], gemelo)
+    otro = indice.buscar("a", utxos[1].txid, 3, {id(encontrado)})
+    assert otro is not encontrado and otro in (utxos[1], gemelo)
+    assert indice.buscar("a", utxos[1].txid, 3, {id(utxos[1]), id(gemelo)}) is None
+
+    assert indice.eliminar(utxos[1])
+    assert not indice.eliminar(utxos[1])
+    assert indice.posicion(gemelo) == 1
+    for utxo in [utxos[0], gemelo, utxos[2]]:
+        indice.eliminar(utxo)
+    assert indice.get("a") == []
+
+
+def repartir(sistema, usuario, montos):
+    """Da al usuario un UTXO por cada monto, minando después de cada envío del génesis."""
+    for monto in montos:
+        sistema.procesar_tx(sistema.primer_usuario, usuario, monto)
+        sistema.minar_bloque(sistema.primer_usuario)
+
+
+def test_transacciones_pendientes_no_comparten_utxos():
+    sistema = Sistema(dificultad=1)
+    a, b = sistema.crear_usuario(), sistema.crear_usuario()
+    repartir(sistema, a, [5, 5])
+
+    primera = sistema.procesar_tx(a, b, 1)
+    segunda = sistema.procesar_tx(a, b, 1)
+    assert primera and segunda
+    assert not {id(u) for u in primera.UTXO_seleccionados} & {id(u) for u in segunda.UTXO_seleccionados}
+    assert sistema.indice_utxos.contar(a.direccion) == 0
+    assert not sistema.procesar_tx(a, b, 1)
+
+    sistema.minar_bloque(b)
+    assert cantidades(sistema.indice_utxos.get(a.direccion)) == pytest.approx([3.9, 3.9])
+
+
+def test_consolidacion_deja_un_solo_utxo():
+    sistema = Sistema(dificultad=1)
+    a = sistema.crear_usuario()
+    repartir(sistema, a, [1, 2, 3])
+
+    assert sistema.consolidar_utxos(a)
+    sistema.minar_bloque(sistema.primer_usuario)
+    assert cantidades(sistema.indice_utxos.get(a.direccion)) == pytest.approx([6 - sistema.mining_fee])
+
+
+def test_consolidacion_automatica():
+    sistema = Sistema(dificultad=1, umbral_consolidacion=2)
+    a, b = sistema.crear_usuario(), sistema.crear_usuario()
+    repartir(sistema, a, [1, 2, 3, 4])
+
+    # Tras el envío quedan tres UTXOs disponibles, más que el umbral, así que se consolidan dos
+    assert sistema.procesar_tx(a, b, 0.5)
+    assert len(sistema.mempool) == 2
+    sistema.minar_bloque(b)
+    assert sistema.indice_utxos.contar(a.direccion) == 3
+    assert sum(u.cantidad for u in sistema.indice_utxos.get(a.direccion)) == pytest.approx(10 - 0.5 - 2 * sistema.mining_fee)